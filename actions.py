@@ -14,29 +14,34 @@ from entity import Actor, Entity, Item, Gold, Shop
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Actor, Entity, Item, Gold, Shop
-        
+
+def expired_buffs(current_buffs: dict, current_turn: int) -> list:
+    """Names of the buffs whose expiry turn has already passed."""
+    return [name for name, expiry in current_buffs.items() if expiry < current_turn]
+
 def check_turn_advance(engine: Engine, entity: Actor):
     if entity == engine.player:
         engine.current_turn += 1
 
-    player_buffs = list(engine.player.battler.current_buffs)
-    for buff in player_buffs:
-        if engine.player.battler.current_buffs[buff] < engine.current_turn:
-            engine.message_log.add_message(f"{engine.player.name}'s {buff} fades.", colors.red)
-            del engine.player.battler.current_buffs[buff]
+    current_turn = engine.current_turn
+    player_buffs = engine.player.battler.current_buffs
+    for buff in expired_buffs(player_buffs, current_turn):
+        engine.message_log.add_message(f"{engine.player.name}'s {buff} fades.", colors.red)
+        del player_buffs[buff]
 
     remove_summons = []
     for npc in engine.game_map.actors:
         if npc == engine.player:
             continue
-        npc_buffs = list(npc.battler.current_buffs)
-        for buff in npc_buffs:
-            if npc.battler.current_buffs[buff] < engine.current_turn:
-                if buff == "Player Summoned":
-                    remove_summons.append(npc)
-                else:
-                    engine.message_log.add_message(f"{npc.name}'s {buff} fades.", colors.red)
-                    del npc.battler.current_buffs[buff]
+        npc_buffs = npc.battler.current_buffs
+        if not npc_buffs:
+            continue
+        for buff in expired_buffs(npc_buffs, current_turn):
+            if buff == "Player Summoned":
+                remove_summons.append(npc)
+            else:
+                engine.message_log.add_message(f"{npc.name}'s {buff} fades.", colors.red)
+                del npc_buffs[buff]
 
     for removes in remove_summons:
         engine.message_log.add_message(f"{removes.name} vanishes in a puff of smoke.", colors.red)
@@ -316,15 +321,14 @@ class FullAttackRangedAction(Action):
             return None
 
 def FindNewTarget(engine: Engine, target, ranged: bool=True):
-    for newtarget in engine.game_map.actors:
+    for newtarget in engine.game_map.visible_actors():
         if newtarget == target or newtarget == engine.player:
             continue
-        if engine.game_map.visible[newtarget.x, newtarget.y]:
-            if ranged == True:
+        if ranged == True:
+            return newtarget
+        else:
+            if InMeleeReach(engine.player, newtarget):
                 return newtarget
-            else:
-                if InMeleeReach(engine.player, newtarget):
-                    return newtarget
     return None
 
 def InMeleeReach(attacker, target):
@@ -543,12 +547,11 @@ class TakeStairsAction(Action):
         """
         Take the stairs, if any exist at the entity's location.
         """
-        stairs_found = False
-        for entity in self.engine.game_map.entities:
-            if (entity.stairs and self.entity.x == entity.x and self.entity.y == entity.y):
-                stairs_found = True
-                found_stairs = entity
-        if stairs_found == True:
+        found_stairs = next(
+            (entity for entity in self.engine.game_map.entities_at(self.entity.x, self.entity.y) if entity.stairs),
+            None,
+        )
+        if found_stairs is not None:
             self.engine.last_level = self.engine.game_map.dungeon_level
             self.engine.game_world.generate_floor(found_stairs.stairs)
             self.engine.message_log.add_message(
@@ -1017,10 +1020,8 @@ class FastMoveAction(ActionWithDirection):
         movecheck = False
         max_moves = 1
         while movecheck == False and max_moves < 100:
-            for enemy in self.engine.game_map.actors:
-                if enemy == self.engine.player:
-                    continue
-                if self.engine.game_map.visible[enemy.x][enemy.y] == True:
+            for enemy in self.engine.game_map.visible_actors():
+                if enemy != self.engine.player:
                     movecheck = True
             destin_x = self.engine.player.x + self.dx
             destin_y = self.engine.player.y + self.dy
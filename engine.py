@@ -1,20 +1,26 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Optional, Tuple, TYPE_CHECKING
 
+import numpy as np # type: ignore
 from tcod.console import Console
 from tcod.map import compute_fov
 
+from entity import Actor
 import exceptions
 from message_log import MessageLog
 from render_functions import render_bar, render_names_at_mouse_location
 from loader_functions.initialize_new_game import get_constants
 
 if TYPE_CHECKING:
-    from entity import Actor, Item
+    from entity import Item
     from game_map import GameMap, GameWorld
     #from input_handlers import EventHandler
 
+# Monsters further than this from the player don't get a turn.  Well past
+# the FOV radius of 12, so nothing that can see the player is skipped.
+AI_ACTIVE_RADIUS = 30
+
 class Engine:
     game_map: GameMap
     game_world: GameWorld
@@ -26,15 +32,36 @@ class Engine:
         self.screen_reset = False
         self.enchant_now = False
         self.enchanting_item: Item = None
-        self.last_keypress: str = "None"
+        self.last_keypress: Optional[str] = None # Targeting cone last cycled through.
         self.num_pressed: int = 0
         self.last_target = player
         self.last_level: int = 0
         self.current_turn: int = 0
+        # What the visible area was last computed from, see update_fov.
+        self._fov_origin: Optional[Tuple[np.ndarray, int, int]] = None
+
+        # Screen layout only needs to be looked up once, not every frame.
+        constants = get_constants()
+        self._msg_y: int = constants['screen_height'] - constants['message_height']
+        self._names_y: int = self._msg_y - 1
+
+    def __getstate__(self) -> dict:
+        """The FOV origin holds a cached map array, so leave it out of saves."""
+        state = self.__dict__.copy()
+        state["_fov_origin"] = None
+        return state
 
     def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
-            if entity.ai:
+        px, py = self.player.x, self.player.y
+        max_distance_squared = AI_ACTIVE_RADIUS * AI_ACTIVE_RADIUS
+        # of_type hands back a cached set that is replaced, never changed, when
+        # entities come and go, so it is safe to loop over while AIs act.
+        for entity in self.game_map.of_type(Actor):
+            if entity is self.player or not entity.ai:
+                continue
+            dx = entity.x - px
+            dy = entity.y - py
+            if dx * dx + dy * dy <= max_distance_squared:
                 try:
                     entity.ai.perform()
                 except exceptions.Impossible:
@@ -42,20 +69,44 @@ class Engine:
 
     def update_fov(self) -> None:
         """Recompute the visible area based on the players point of view."""
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles["transparent"],
-            (self.player.x, self.player.y),
-            radius = 12,
-        )
-        # If a tile is "visible" it should be added to "explored".
-        self.game_map.explored |= self.game_map.visible
+        # Nothing past the light radius can be seen, so only compute the
+        # square around the player.
+        radius = 12
+        px, py = self.player.x, self.player.y
+
+        # Actions that leave the player where they were on an unchanged map,
+        # waiting or using a menu, can't change what they see.  A new map, or
+        # a set_tiles call on this one, hands back a new transparent array.
+        transparent = self.game_map.tile_field("transparent")
+        if self._fov_origin is not None:
+            last_transparent, last_x, last_y = self._fov_origin
+            if last_transparent is transparent and (last_x, last_y) == (px, py):
+                return
+        self._fov_origin = (transparent, px, py)
+
+        x0, x1 = max(0, px - radius), min(self.game_map.width, px + radius + 1)
+        y0, y1 = max(0, py - radius), min(self.game_map.height, py + radius + 1)
+
+        # tcod works on row-major [y, x] buffers, so hand it the transposed
+        # view of our [x, y] map and transpose the result back.  Both are
+        # free views, and the copy into visible then runs in memory order.
+        fov = compute_fov(
+            transparent[x0:x1, y0:y1].T,
+            (py - y0, px - x0),
+            radius = radius,
+        ).T
+        self.game_map.visible.fill(False)
+        self.game_map.visible[x0:x1, y0:y1] = fov
+        # If a tile is "visible" it should be added to "explored".  Only the
+        # window can have changed, so leave the rest of the map alone.
+        explored = self.game_map.explored[x0:x1, y0:y1]
+        np.logical_or(explored, fov, out = explored)
+        self.game_map.fov_changed((x0, x1, y0, y1))
 
     def render(self, console: Console) -> None:
         self.game_map.render(console)
 
-        constants = get_constants()
-
-        self.message_log.render(console = console, x = 25, y = constants['screen_height'] - constants['message_height'], width = 40, height = 5)
+        self.message_log.render(console = console, x = 25, y = self._msg_y, width = 40, height = 5)
 
         render_bar(
             console = console,
@@ -72,4 +123,4 @@ class Engine:
             game_turn = self.current_turn
         )
 
-        render_names_at_mouse_location(console = console, x = 25, y = constants['screen_height'] - constants['message_height'] - 1, engine = self)
+        render_names_at_mouse_location(console = console, x = 25, y = self._names_y, engine = self)
@@ -12,6 +12,8 @@ import tile_types
 import colors
 import random
 
+import numpy as np # type: ignore
+
 if TYPE_CHECKING:
     from components.ai import BaseAI
     from components.consumable import Consumable
@@ -22,6 +24,14 @@ if TYPE_CHECKING:
 
 T = TypeVar("T", bound = "Entity")
 
+#Could randomize?  Sort 3X3 randomly by absolute value ascending?  Currently 2-3 items -1, 0
+#is always picked, 0, -1 close to never.
+DROP_OFFSETS = np.array(
+    [(0, 0), (-1, 0), (0, 1), (1, 0), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1),
+     (0, 2), (2, 0), (0, -2), (-2, 0), (1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1),
+     (2, -1), (-2, 1), (-2, -1), (2, 2), (2, -2), (-2, 2), (-2, -2)]
+)
+
 class Entity:
     """
     A generic object to represent players, enemies, items, etc.
@@ -71,6 +81,17 @@ class Entity:
     def gamemap(self) -> GameMap:
         return self.parent.gamemap
 
+    @property
+    def render_order(self) -> RenderOrder:
+        return self._render_order
+
+    @render_order.setter
+    def render_order(self, value: RenderOrder) -> None:
+        # The map caches render orders for drawing, e.g. corpses drop under items.
+        self._render_order = value
+        if hasattr(self, "parent") and self.parent is self.gamemap:
+            self.gamemap.render_order_changed(self)
+
     @property
     def base_gold(self) -> int:
         base_gold_by_cr = {0.125: 15, 0.2: 20, 0.25: 25, 0.4: 33, 0.5: 50,
@@ -144,25 +165,15 @@ class Entity:
         clone = copy.deepcopy(self)
         temp_x = x
         temp_y = y
-        blocked = False
-        #Could randomize?  Sort 3X3 randomly by absolute value ascending?  Currently 2-3 items -1, 0
-        #is always picked, 0, -1 close to never.
-        for (i, j) in [(0, 0), (-1, 0), (0, 1), (1, 0), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1),
-                       (0, 2), (2, 0), (0, -2), (-2, 0), (1, 2), (1, -2), (-1, 2), (-1, -2), (2, 1),
-                       (2, -1), (-2, 1), (-2, -1), (2, 2), (2, -2), (-2, 2), (-2, -2)]:
-            if x + i not in range(0, gamemap.width) or y + j not in range(0, gamemap.height):
-                blocked = True
-            if gamemap.tiles[x + i, y + j] != tile_types.floor:
-                blocked = True
-            for entity in gamemap.entities:
-                if entity.x == x + i and entity.y == y + j:
-                    blocked = True
-                    break
-            if blocked == False:
-                temp_x = x + i
-                temp_y = y + j
+        drop_xs = x + DROP_OFFSETS[:, 0]
+        drop_ys = y + DROP_OFFSETS[:, 1]
+        # Check bounds for every spot at once, only in bounds spots get looked at.
+        in_bounds = gamemap.in_bounds_bulk(drop_xs, drop_ys)
+        for drop_x, drop_y in zip(drop_xs[in_bounds].tolist(), drop_ys[in_bounds].tolist()):
+            if gamemap.tiles[drop_x, drop_y] == tile_types.floor and not gamemap.entities_at(drop_x, drop_y):
+                temp_x = drop_x
+                temp_y = drop_y
                 break
-            blocked = False
         clone.x = temp_x
         clone.y = temp_y
         clone.parent = gamemap
@@ -171,6 +182,7 @@ class Entity:
 
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
         """Place this entity at a new location.  Handles moving across GameMaps."""
+        old_x, old_y = self.x, self.y
         self.x = x
         self.y = y
         if gamemap:
@@ -179,6 +191,8 @@ class Entity:
                     self.gamemap.entities.remove(self)
             self.parent = gamemap
             gamemap.entities.add(self)
+        elif hasattr(self, "parent") and self.parent is self.gamemap:
+            self.gamemap.entity_moved(self, old_x, old_y)
 
     def distance(self, x: int, y: int) -> float:
         """
@@ -190,6 +204,8 @@ class Entity:
         # Move the entity by a given amount
         self.x += dx
         self.y += dy
+        if self.parent is self.gamemap:
+            self.gamemap.entity_moved(self, self.x - dx, self.y - dy)
 
 class Shop(Entity):
     def __init__(
@@ -338,6 +354,21 @@ class Item(Entity):
         self.can_stack = can_stack
         self.masterwork = masterwork
 
+    @property
+    def sell_price(self) -> int:
+        """What shops pay for one of this item: half its value, rounded down."""
+        return int(self.gold_value // 2)
+
+    def clone(self) -> Item:
+        """Return a copy of this item that isn't in any container yet.
+
+        The parent is left out of the deepcopy, so copying an item doesn't also copy the
+        inventory, actor or map it belongs to.
+        """
+        parent = getattr(self, "parent", None)
+        memo = {} if parent is None else {id(parent): None}
+        return copy.deepcopy(self, memo)
+
 class Bag(Item):
     def __init__(
         self,
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import functools
+import types
 from typing import List, TYPE_CHECKING
 
+@functools.lru_cache(maxsize = 1)
 def get_all_feats():
+    """Return (taken_once_feats, taken_multiple_feats).  Built once, read-only."""
     
     taken_once_feats = {
         "Toughness": {},
@@ -35,24 +39,29 @@ def get_all_feats():
         "Extra Turning": {},
     }
 
-    return taken_once_feats, taken_multiple_feats
+    return types.MappingProxyType(taken_once_feats), types.MappingProxyType(taken_multiple_feats)
+
+@functools.lru_cache(maxsize = 1)
+def get_feat_names():
+    """Return the names of (taken_once_feats, taken_multiple_feats) as frozensets."""
+    taken_once_feats, taken_multiple_feats = get_all_feats()
+    return frozenset(taken_once_feats), frozenset(taken_multiple_feats)
 
 def get_feat_reqs(pc, feat: {}):
 
-    if len(feat) == 0:
+    if not feat:
         return True
 
-    if "Feats" in feat:
-        for i in range(len(feat["Feats"])):
-            if feat["Feats"][i] not in pc.battler.combat_feats:
-                return False
+    battler = pc.battler
+    combat_feats = battler.combat_feats
+    if not all(req in combat_feats for req in feat.get("Feats", ())):
+        return False
 
-    if "BAB" in feat:
-        if pc.battler.bab < feat["BAB"]:
-            return False
+    bab = battler.bab
+    if bab < feat.get("BAB", 0):
+        return False
 
-    if "Fighter Level" in feat:
-        if pc.battler.bab < feat["Fighter Level"]:
-            return False
+    if bab < feat.get("Fighter Level", 0):
+        return False
 
     return True
@@ -1,17 +1,64 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from collections.abc import MutableSet
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Type, TYPE_CHECKING
 
 import numpy as np # type: ignore
 from tcod.console import Console
 
 from entity import Actor, Item, Gold, Shop, Enchant, Stairs
+from render_order import RenderOrder
 import tile_types
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Entity
 
+# Drawn first to last, so later orders end up on top.
+_RENDER_ORDER_VALUES = sorted(RenderOrder)
+
+class EntitySet(MutableSet):
+    """
+    The entities on a GameMap, kept in the order they were added.
+
+    Works like a normal set, but iterates in a fixed order and lets the map
+    know whenever an entity is added or removed so it can rebuild its
+    lookup tables.
+    """
+
+    def __init__(self, entities: Iterable[Entity] = (), gamemap: Optional[GameMap] = None):
+        # A dict with no values, since dicts keep insertion order and sets don't.
+        self._entities: Dict[Entity, None] = dict.fromkeys(entities)
+        self.gamemap = gamemap
+
+    def __contains__(self, entity: object) -> bool:
+        return entity in self._entities
+
+    def __iter__(self) -> Iterator[Entity]:
+        return iter(self._entities)
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def add(self, entity: Entity) -> None:
+        self._entities[entity] = None
+        self.changed()
+
+    def discard(self, entity: Entity) -> None:
+        if entity in self._entities:
+            del self._entities[entity]
+            self.changed()
+
+    def changed(self) -> None:
+        if self.gamemap is not None:
+            self.gamemap.entities_changed()
+
+# GameMap attributes set up by init_caches, which are rebuilt instead of saved.
+TRANSIENT_FIELDS = frozenset({
+    "_pos_index", "_by_type", "_ent_list", "_ent_slot", "_ent_xs", "_ent_ys", "_ent_orders",
+    "_ent_persistent", "_tile_fields", "_render_buf", "_render_dirty", "_vis_state", "_fov_window",
+})
+
 class GameMap:
     def __init__(
         self,
@@ -24,7 +71,7 @@ class GameMap:
     ):
         self.engine = engine
         self.width, self.height = width, height
-        self.entities = set(entities)
+        self.entities = EntitySet(entities, gamemap = self)
         self.tiles = np.full((width, height), fill_value = tile_types.wall, order = "F")
 
         self.dungeon_level = dungeon_level
@@ -37,56 +84,233 @@ class GameMap:
             (width, height), fill_value = False, order = "F"
         ) # Tiles the player has seen before.
 
+        self.init_caches()
+
+    def init_caches(self) -> None:
+        """
+        Set up the lookup caches and render buffers.  None of these are
+        saved, they are all rebuilt from the map and its entities.
+        """
+        width, height = self.width, self.height
+        # (x, y) -> entities standing there.  Built on demand, see entities_at.
+        self._pos_index: Optional[Dict[Tuple[int, int], List[Entity]]] = None
+        # Entity class -> entities of that class.  Built on demand, see of_type.
+        self._by_type: Optional[Dict[Type[Entity], FrozenSet[Entity]]] = None
+        # Entity positions as parallel arrays for the renderer.  Built on
+        # demand, see entity_arrays.
+        self._ent_list: Optional[List[Entity]] = None
+        self._ent_slot: Dict[Entity, int] = {}
+        self._ent_xs = np.zeros(0, dtype = np.intp)
+        self._ent_ys = np.zeros(0, dtype = np.intp)
+        self._ent_orders = np.zeros(0, dtype = np.intp)
+        self._ent_persistent = np.zeros(0, dtype = bool)
+        # Contiguous copies of single tile fields.  Built on demand, see tile_field.
+        self._tile_fields: Dict[str, np.ndarray] = {}
+
+        # The map graphics, kept between frames.  Only the regions listed in
+        # _render_dirty, as (x0, x1, y0, y1), are rebuilt before blitting.
+        self._render_buf = np.full(
+            (width, height), fill_value = tile_types.SHROUD, order = "F"
+        )
+        self._render_dirty: List[Tuple[int, int, int, int]] = [(0, width, 0, height)]
+        # Scratch space for the per-tile visibility state used while rebuilding.
+        self._vis_state = np.zeros((width, height), dtype = np.uint8, order = "F")
+        self._fov_window: Optional[Tuple[int, int, int, int]] = None
+
+    def __getstate__(self) -> dict:
+        """Pickle only the map itself, see init_caches for what is left out."""
+        return {name: value for name, value in self.__dict__.items() if name not in TRANSIENT_FIELDS}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        # A map saved read-only (see tile_field) can come back backed by
+        # immutable bytes.  No field copies exist yet, so give it its own.
+        if not self.tiles.flags.writeable:
+            self.tiles = self.tiles.copy(order = "F")
+        self.init_caches()
+
     @property
     def gamemap(self) -> GameMap:
         return self
 
+    def of_type(self, entity_class: Type[Entity]) -> FrozenSet[Entity]:
+        """
+        Return the entities on this map that are instances of entity_class.
+
+        The sets are rebuilt rather than changed when entities are added or
+        removed, so it is safe to remove entities while looping over one.
+        """
+        if self._by_type is None:
+            groups = {
+                group_class: [] for group_class in (Actor, Item, Gold, Shop, Enchant, Stairs)
+            }
+            for entity in self.entities:
+                for group_class, group in groups.items():
+                    if isinstance(entity, group_class):
+                        group.append(entity)
+            self._by_type = {
+                group_class: frozenset(group) for group_class, group in groups.items()
+            }
+        return self._by_type[entity_class]
+
+    # The properties below, other than actors, are cached frozensets, so
+    # "entity in game_map.shops" is a cheap lookup.  actors has to check
+    # is_alive each time and stays a generator, don't use it with "in".
+
     @property
     def actors(self) -> Iterator[Actor]:
         """Iterate over this maps living actors."""
-        yield from (
-            entity
-            for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-        )
+        yield from (actor for actor in self.of_type(Actor) if actor.is_alive)
 
     @property
-    def items(self) -> Iterator[Item]:
-        yield from (entity for entity in self.entities if isinstance(entity, Item))
+    def items(self) -> FrozenSet[Item]:
+        return self.of_type(Item)
 
     @property
-    def gold_piles(self) -> Iterator[Gold]:
-        yield from (entity for entity in self.entities if isinstance(entity, Gold))
+    def gold_piles(self) -> FrozenSet[Gold]:
+        return self.of_type(Gold)
 
     @property
-    def shops(self) -> Iterator[Shop]:
-        yield from (entity for entity in self.entities if isinstance(entity, Shop))
+    def shops(self) -> FrozenSet[Shop]:
+        return self.of_type(Shop)
 
     @property
-    def enchant(self) -> Iterator[Enchant]:
-        yield from (entity for entity in self.entities if isinstance(entity, Enchant))
+    def enchant(self) -> FrozenSet[Enchant]:
+        return self.of_type(Enchant)
 
     @property
-    def stairs_iter(self) -> Iterator[Stairs]:
-        yield from (entity for entity in self.entities if isinstance(entity, Stairs))
+    def stairs_iter(self) -> FrozenSet[Stairs]:
+        return self.of_type(Stairs)
+
+    def fov_changed(self, window: Tuple[int, int, int, int]) -> None:
+        """
+        Called after visible and explored are updated inside window, given
+        as (x0, x1, y0, y1).  The previous window is redrawn too, since
+        anything visible there has gone dark.
+        """
+        if self._fov_window is not None:
+            self._render_dirty.append(self._fov_window)
+        self._render_dirty.append(window)
+        self._fov_window = window
+
+    def tile_field(self, name: str) -> np.ndarray:
+        """
+        Return one field of self.tiles, e.g. "transparent", as its own
+        contiguous array.  Reading a field straight from self.tiles skips
+        over the other fields of every tile.
+
+        Once a copy exists self.tiles is made read-only, so a stray write
+        fails loudly instead of leaving the copies stale.  Change tiles in
+        play with set_tiles.
+        """
+        if name not in self._tile_fields:
+            self._tile_fields[name] = np.asfortranarray(self.tiles[name])
+            self.tiles.flags.writeable = False
+        return self._tile_fields[name]
+
+    def set_tiles(self, index, tile: np.ndarray) -> None:
+        """Set self.tiles[index] to tile, e.g. to open a door, once the map is in play."""
+        self.tiles.flags.writeable = True
+        self.tiles[index] = tile
+        self.tiles_changed()
+
+    def tiles_changed(self) -> None:
+        """Drop the tile field copies and redraw the whole map.  set_tiles calls this."""
+        self._tile_fields.clear()
+        self._render_dirty = [(0, self.width, 0, self.height)]
+
+    def entities_changed(self) -> None:
+        """Called by self.entities when an entity is added or removed."""
+        self._pos_index = None
+        self._by_type = None
+        self._ent_list = None
+
+    def entity_moved(self, entity: Entity, old_x: int, old_y: int) -> None:
+        """Update the position index and arrays after an entity moves."""
+        if self._ent_list is not None and entity in self._ent_slot:
+            slot = self._ent_slot[entity]
+            self._ent_xs[slot] = entity.x
+            self._ent_ys[slot] = entity.y
+
+        if self._pos_index is None:
+            return
+        old_square = self._pos_index.get((old_x, old_y))
+        if old_square is None or entity not in old_square:
+            return
+        old_square.remove(entity)
+        if not old_square:
+            del self._pos_index[old_x, old_y]
+        self._pos_index.setdefault((entity.x, entity.y), []).append(entity)
+
+    def render_order_changed(self, entity: Entity) -> None:
+        """Called by an entity on this map when its render_order is changed."""
+        if self._ent_list is not None and entity in self._ent_slot:
+            self._ent_orders[self._ent_slot[entity]] = entity.render_order
+
+    def entity_arrays(self) -> Tuple[List[Entity], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return (entities, xs, ys, render orders, persistent) as parallel sequences.
+
+        persistent is True for stairs and shops, which stay drawn once explored.
+        """
+        if self._ent_list is None:
+            self._ent_list = list(self.entities)
+            self._ent_slot = {entity: slot for slot, entity in enumerate(self._ent_list)}
+            self._ent_xs = np.array([entity.x for entity in self._ent_list], dtype = np.intp)
+            self._ent_ys = np.array([entity.y for entity in self._ent_list], dtype = np.intp)
+            self._ent_orders = np.array(
+                [entity.render_order for entity in self._ent_list], dtype = np.intp
+            )
+            stairs_or_shops = self.stairs_iter | self.shops
+            self._ent_persistent = np.array(
+                [entity in stairs_or_shops for entity in self._ent_list], dtype = bool
+            )
+        return self._ent_list, self._ent_xs, self._ent_ys, self._ent_orders, self._ent_persistent
+
+    def visible_actors(self) -> List[Actor]:
+        """Return the living actors in the players field of view."""
+        entities, xs, ys, _, _ = self.entity_arrays()
+        return [
+            entities[slot]
+            for slot in np.flatnonzero(self.visible[xs, ys])
+            if isinstance(entities[slot], Actor) and entities[slot].is_alive
+        ]
+
+    def entities_at(self, x: int, y: int) -> List[Entity]:
+        """Return the entities at x, y.  Do not modify the returned list."""
+        if self._pos_index is None:
+            self._pos_index = {}
+            for entity in self.entities:
+                self._pos_index.setdefault((entity.x, entity.y), []).append(entity)
+        return self._pos_index.get((x, y), [])
 
     def get_blocking_entity_at_location(
         self, location_x: int, location_y: int,
     ) -> Optional[Entity]:
-        for entity in self.entities:
-            if (
-                entity.blocks_movement
-                and entity.x == location_x
-                and entity.y == location_y
-            ):
+        for entity in self.entities_at(location_x, location_y):
+            if entity.blocks_movement:
                 return entity
             
         return None
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        for entity in self.entities_at(x, y):
+            if isinstance(entity, Actor) and entity.is_alive:
+                return entity
+
+        return None
+
+    def get_shop_at_location(self, x: int, y: int) -> Optional[Shop]:
+        for entity in self.entities_at(x, y):
+            if isinstance(entity, Shop):
+                return entity
+
+        return None
+
+    def get_enchant_at_location(self, x: int, y: int) -> Optional[Enchant]:
+        for entity in self.entities_at(x, y):
+            if isinstance(entity, Enchant):
+                return entity
 
         return None
 
@@ -94,6 +318,10 @@ class GameMap:
         """Return True if x and y are inside of the bounds of this map."""
         return 0 <= x < self.width and 0 <= y < self.height
 
+    def in_bounds_bulk(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Like in_bounds, but checks arrays of x and y at once and returns a mask."""
+        return (0 <= xs) & (xs < self.width) & (0 <= ys) & (ys < self.height)
+
     def render(self, console: Console) -> None:
         """
         Renders the map.
@@ -103,30 +331,52 @@ class GameMap:
         Otherwise, the default is "SHROUD".
         """
         
-        console.tiles_rgb[0 : self.width, 0 : self.height] = np.select(
-            condlist=[self.visible, self.explored],
-            choicelist=[self.tiles["light"], self.tiles["dark"]],
-            default=tile_types.SHROUD
-        )
+        buf = self._render_buf
+        for x0, x1, y0, y1 in self._render_dirty:
+            window = np.s_[x0:x1, y0:y1]
+            # Visible tiles are always explored, so this is 0 for shroud,
+            # 1 for explored and 2 for visible, and one choose fills the window.
+            vis_state = np.add(
+                self.explored[window].view(np.uint8),
+                self.visible[window].view(np.uint8),
+                out = self._vis_state[window],
+            )
+            np.choose(
+                vis_state,
+                (tile_types.SHROUD, self.tile_field("dark")[window], self.tile_field("light")[window]),
+                out = buf[window],
+            )
+        self._render_dirty.clear()
+        # Copy through the transposed [y, x] views so the blit runs in the
+        # same row-major order as the console memory.
+        console.tiles_rgb[0 : self.width, 0 : self.height].T[...] = buf.T
         
         """
         console.tiles_rgb[0 : self.width, 0 : self.height] = 10150, [255, 255, 0], [0, 0, 0]
         """
         
-        entities_sorted_for_rendering = sorted(
-            self.entities, key = lambda x: x.render_order.value
-        )
-        
+        # Only print entities that are in the FOV, plus stairs and shops that
+        # have been seen.  The test runs over every entity in one numpy call.
+        entities, xs, ys, orders, persistent = self.entity_arrays()
+        shown = self.visible[xs, ys] | (persistent & self.explored[xs, ys])
 
-        for entity in entities_sorted_for_rendering:
-            # Only print entities that are in the FOV
-            if self.visible[entity.x, entity.y] or ((entity in self.stairs_iter or entity in self.shops) and self.explored[entity.x, entity.y]):
-                if entity.tile_code == 0:
-                    console.print(
-                        x = entity.x, y = entity.y, string = entity.char, fg = entity.color
-                    )
-                else:
-                    console.tiles_rgb[entity.x, entity.y] = entity.tile_code, entity.tile_colors[0], entity.tile_colors[1] #[255, 255, 255], [255, 255, 255]
+        # Each render order is written with one array assignment for tiled
+        # entities and one for plain characters, which keep the background
+        # like print does.  The cached orders array means no sorting.
+        for order in _RENDER_ORDER_VALUES:
+            bucket = [entities[slot] for slot in np.flatnonzero(shown & (orders == order))]
+            tiled = [entity for entity in bucket if entity.tile_code != 0]
+            if tiled:
+                console.tiles_rgb[[e.x for e in tiled], [e.y for e in tiled]] = np.array(
+                    [(e.tile_code, e.tile_colors[0], e.tile_colors[1]) for e in tiled],
+                    dtype = console.tiles_rgb.dtype,
+                )
+            glyphs = [entity for entity in bucket if entity.tile_code == 0]
+            if glyphs:
+                glyph_xs = [e.x for e in glyphs]
+                glyph_ys = [e.y for e in glyphs]
+                console.tiles_rgb["ch"][glyph_xs, glyph_ys] = [ord(e.char) for e in glyphs]
+                console.tiles_rgb["fg"][glyph_xs, glyph_ys] = [e.color for e in glyphs]
 
 class GameWorld:
     """
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from typing import Callable, Optional, Tuple, TYPE_CHECKING, List, Union
+from typing import Callable, Dict, Iterator, Mapping, Optional, Set, Tuple, TYPE_CHECKING, List, Union
 
 from loader_functions.data_loaders import save_game, load_game
 from loader_functions.initialize_new_game import get_constants
-from feat_stuff import get_all_feats, get_feat_reqs
+from feat_stuff import get_all_feats, get_feat_names, get_feat_reqs
 from equipment_slots import EquipmentSlots
 import feat_stuff
 import components.enchanter
@@ -12,11 +12,12 @@ import components.enchanter
 from procgen import generate_dungeon, generate_town
 from entity import Item, Bag
  
+import numpy as np # type: ignore
 import tcod
 import tcod.event
 import tcod.console
-import copy
-import math
+import functools
+import types
 
 import actions
 from actions import (
@@ -38,8 +39,11 @@ import exceptions
 
 if TYPE_CHECKING:
     from engine import Engine
+    from entity import Actor
 
-MOVE_KEYS = {
+# The key tables are read-only, MappingProxyType and frozenset stop them
+# being changed by accident.
+MOVE_KEYS = types.MappingProxyType({
     # Arrow keys.
     tcod.event.K_UP: (0, -1),
     tcod.event.K_DOWN: (0, 1),
@@ -67,18 +71,125 @@ MOVE_KEYS = {
     #tcod.event.K_u: (1, -1),
     #tcod.event.K_b: (-1, 1),
     #tcod.event.K_n: (1, 1),
-}
+})
 
-WAIT_KEYS = {
+WAIT_KEYS = frozenset({
     tcod.event.K_PERIOD,
     tcod.event.K_KP_5,
     tcod.event.K_CLEAR,
-}
+})
 
-CONFIRM_KEYS = {
+CONFIRM_KEYS = frozenset({
     tcod.event.K_RETURN,
     tcod.event.K_KP_ENTER,
-}
+})
+
+# Arrow and keypad keys -> the cone SelectMonsterHandler cycles targets in.
+TARGET_DIRECTION_KEYS = types.MappingProxyType({
+    tcod.event.K_UP: "Up",
+    tcod.event.K_KP_8: "Up",
+    tcod.event.K_DOWN: "Down",
+    tcod.event.K_KP_2: "Down",
+    tcod.event.K_LEFT: "Left",
+    tcod.event.K_KP_4: "Left",
+    tcod.event.K_RIGHT: "Right",
+    tcod.event.K_KP_6: "Right",
+})
+
+MODIFIER_KEYS = frozenset({
+    tcod.event.K_LSHIFT,
+    tcod.event.K_RSHIFT,
+    tcod.event.K_LCTRL,
+    tcod.event.K_RCTRL,
+    tcod.event.K_LALT,
+    tcod.event.K_RALT,
+})
+
+SHIFT_MASK = tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT
+CTRL_MASK = tcod.event.KMOD_LCTRL | tcod.event.KMOD_RCTRL
+ALT_MASK = tcod.event.KMOD_LALT | tcod.event.KMOD_RALT
+
+# TEXT_KEYS[shift held][key] -> character typed, for naming items and save games.
+TEXT_KEYS = (
+    types.MappingProxyType({key: chr(key) for key in range(ord(" "), ord("~") + 1)}),
+    types.MappingProxyType({
+        **{key: chr(key).upper() for key in range(tcod.event.K_a, tcod.event.K_z + 1)},
+        tcod.event.K_EQUALS: "+",
+    }),
+)
+
+# Menu key labels: 'a' to 'z', then the same characters chr() gives past 'z' for long lists.
+LOWER_LETTERS = tuple(chr(i) for i in range(ord("a"), ord("a") + 64))
+
+# Equipment slot attribute -> inventory label.  The main hand is handled separately since its label depends on the weapon.
+EQUIPPED_LABELS = (
+    ("off_hand", " (on off hand)"),
+    ("ranged", " (as ranged)"),
+    ("body", " (worn on body)"),
+    ("neck", " (worn on neck)"),
+    ("waist", " (on waist)"),
+    ("lring", " (on left hand)"),
+    ("rring", " (on right hand)"),
+    ("head", " (on head)"),
+    ("cloak", " (worn on shoulders)"),
+    ("eyes", " (worn on face)"),
+    ("shirt", " (worn about torso)"),
+    ("wrists", " (worn on wrists)"),
+    ("feet", " (worn on feet)"),
+    ("hands", " (worn on hands)"),
+    ("misc", " (worn slotless)"),
+)
+
+# What the main hand label says depends on how the weapon is held.
+MAIN_HAND_LABELS = types.MappingProxyType({
+    EquipmentSlots.MAIN_HAND: " (in main hand)",
+    EquipmentSlots.TWO_HAND: " (in both hands)",
+})
+
+EQUIPMENT_SLOT_NAMES = ("main_hand",) + tuple(slot_name for slot_name, label in EQUIPPED_LABELS)
+
+# (slot name, label) in the order the equipment screen lists them, one letter per slot.
+EQUIPMENT_SCREEN_SLOTS = (
+    ("main_hand", "in main hand"),
+    ("off_hand", "on off hand"),
+    ("body", "worn on body"),
+    ("neck", "worn on neck"),
+    ("ranged", "as ranged"),
+    ("waist", "on waist"),
+    ("lring", "on left hand"),
+    ("rring", "on right hand"),
+    ("head", "on head"),
+    ("cloak", "worn on shoulders"),
+    ("eyes", "worn on eyes"),
+    ("shirt", "worn about torso"),
+    ("wrists", "worn on wrists"),
+    ("feet", "worn on feet"),
+    ("hands", "worn on hands"),
+    ("misc", "as Animated Shield"),
+)
+
+def equipped_items(equipment) -> Iterator[Item]:
+    """Yield every item currently equipped."""
+    for slot_name in EQUIPMENT_SLOT_NAMES:
+        item = getattr(equipment, slot_name)
+        if item is not None:
+            yield item
+
+def equipped_ids(equipment) -> Set[int]:
+    """Return the ids of every item currently equipped, for one-lookup "is it worn?" checks."""
+    return {id(item) for item in equipped_items(equipment)}
+
+def equipped_item_labels(equipment) -> Dict[int, str]:
+    """Return {id(item): label} for every equipped item, so menus need one lookup per item."""
+    labels = {}
+    main_hand = equipment.main_hand
+    if main_hand is not None:
+        labels[id(main_hand)] = MAIN_HAND_LABELS.get(main_hand.equippable.slot, "")
+    for slot_name, label in EQUIPPED_LABELS:
+        item = getattr(equipment, slot_name)
+        if item is not None:
+            labels.setdefault(id(item), label)
+    return labels
 
 ActionOrHandler = Union[Action, "BaseEventHandler"]
 """An event handler return value which can trigger an action or switch active handlers.
@@ -89,10 +200,13 @@ MainGameEventHandler will become the active handler.
 """
 
 class BaseEventHandler(tcod.event.EventDispatch[ActionOrHandler]):
+    # Checked instead of isinstance() on every event.  Read from the type so a handler class is not mistaken for a handler.
+    is_event_handler = True
+
     def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
         """Handle an event and return the next active event handler."""
         state = self.dispatch(event)
-        if isinstance(state, BaseEventHandler):
+        if getattr(type(state), "is_event_handler", False):
             return state
         assert not isinstance(state, Action), f"{self!r} can not handle actions."
         return self
@@ -110,7 +224,7 @@ class EventHandler(BaseEventHandler):
     def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
         """Handle events for input handlers with an engine."""
         action_or_state = self.dispatch(event)
-        if isinstance(action_or_state, BaseEventHandler):
+        if getattr(type(action_or_state), "is_event_handler", False):
             return action_or_state
         if self.handle_action(action_or_state):
             # A valid action was performed.
@@ -150,8 +264,6 @@ class MainGameEventHandler(EventHandler):
     def ev_keydown(
         self, event: tcod.event.KeyDown
         ) -> Optional[ActionOrHandler]:
-        action: Optional[Action] = None
-
         key = event.sym
         modifier = event.mod
 
@@ -162,142 +274,138 @@ class MainGameEventHandler(EventHandler):
         # Even uglier: You can move once here during game over, so waitaction wastes final turn
         if player.char == "%":
             return GameOverEventHandler(self.engine)
-            action = WaitAction(player)
-
-        if key in MOVE_KEYS and modifier & (
-            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT):
-            dx, dy = MOVE_KEYS[key]
-            action = FastMoveAction(player, dx, dy)
-        elif key in MOVE_KEYS:
-            dx, dy = MOVE_KEYS[key]
-            action = BumpAction(player, dx, dy)
-        elif key in (tcod.event.K_PERIOD, tcod.event.K_COMMA) and modifier & (
-            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT):
-            action = TakeStairsAction(player)
-        elif key in WAIT_KEYS:
-            action = WaitAction(player)
-
-        elif key == tcod.event.K_q and modifier & (
-            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT):
-            return GameOverEventHandler(self.engine)
-        elif key == tcod.event.K_v:
-            return HistoryViewer(self.engine)
-
-        elif key == tcod.event.K_g:
-            action = PickupAction(player)
-        elif key == tcod.event.K_x:
-            action = ToggleCombatModeAction(player)
-
-        elif key == tcod.event.K_i:
-            return InventoryActivateHandler(self.engine)
-        elif key == tcod.event.K_d:
-            return InventoryDropHandler(self.engine)
-        elif key == tcod.event.K_e:
-            return EquipmentHandler(self.engine)
-        elif key == tcod.event.K_SLASH and modifier & (
-            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT
-        ):
-            return HelpMenuEventHandler(self.engine)
-        elif key == tcod.event.K_SLASH:
-            return LookHandler(self.engine)
-        elif key == tcod.event.K_c:
-            return CharacterScreenEventHandler(self.engine)
-        elif key == tcod.event.K_a:
-            return LevelUpMenuEventHandler(self.engine)
-        elif key == tcod.event.K_f:
-            return FeatSelectionEventHandler(self.engine)
-        elif key == tcod.event.K_r:
-            return RenameItemEventHandler(self.engine)
-        elif key == tcod.event.K_s and modifier & (
-            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT
-        ):
-            return CastSpellHandler(self.engine)
-        elif key == tcod.event.K_s:
-            return SaveGameEventHandler
-            """
-            save_game(self.engine, self.engine.player, self.engine.game_map)
-            self.engine.message_log.add_message("Game saved.", colors.white)
-            """
-        elif key == tcod.event.K_t:
-            return SingleRangedAttackHandler(
-                self.engine,
-                callback = lambda xy: actions.FullAttackRangedAction(self.engine.player, xy),
-                )
-        elif key == tcod.event.K_b and modifier & (
-            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT
-        ):
-            return BuffListHandler(self.engine)
-        elif key == tcod.event.K_b:
-            shop_found = False
-            for shop in self.engine.game_map.shops:
-                if shop.x == self.engine.player.x and shop.y == self.engine.player.y:
-                    return ShopBuyEventHandler(self.engine)
-                    shop_found = True
-            if shop_found == False:
-                self.engine.message_log.add_message("No shop is here to buy from.", colors.white)
-        elif key == tcod.event.K_n:
-            shop_found = False
-            for shop in self.engine.game_map.shops:
-                if shop.x == self.engine.player.x and shop.y == self.engine.player.y:
-                    return ShopSellEventHandler(self.engine)
-                    shop_found = True
-            if shop_found == False:
-                self.engine.message_log.add_message("No shop is here to sell to.", colors.white)
-        elif key == tcod.event.K_u and modifier & (
-            tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT
-        ):
-            enchant_found = False
-            for enchant in self.engine.game_map.enchant:
-                if enchant.x == self.engine.player.x and enchant.y == self.engine.player.y:
-                    return EnchantEventHandler(self.engine)
-                    enchant_found = True
-            if enchant_found == False:
-                self.engine.message_log.add_message("You cannot enchant items here.", colors.white)
-                    
+
+        shift = bool(modifier & SHIFT_MASK)
+
+        move = MOVE_KEYS.get(key)
+        if move:
+            dx, dy = move
+            if shift:
+                return FastMoveAction(player, dx, dy)
+            return BumpAction(player, dx, dy)
+
+        # Shifted keys without a binding of their own do the unshifted command.
+        command = (shift and MAIN_SHIFT_KEY_COMMANDS.get(key)) or MAIN_KEY_COMMANDS.get(key)
+        if command:
+            return command(self)
+
         # No valid key was pressed
-        return action
+        return None
 
-CURSOR_Y_KEYS = {
+    def buy_from_shop(self) -> Optional[ActionOrHandler]:
+        player = self.engine.player
+        if self.engine.game_map.get_shop_at_location(player.x, player.y):
+            return ShopBuyEventHandler(self.engine)
+        self.engine.message_log.add_message("No shop is here to buy from.", colors.white)
+        return None
+
+    def sell_to_shop(self) -> Optional[ActionOrHandler]:
+        player = self.engine.player
+        if self.engine.game_map.get_shop_at_location(player.x, player.y):
+            return ShopSellEventHandler(self.engine)
+        self.engine.message_log.add_message("No shop is here to sell to.", colors.white)
+        return None
+
+    def enchant_here(self) -> Optional[ActionOrHandler]:
+        player = self.engine.player
+        if self.engine.game_map.get_enchant_at_location(player.x, player.y):
+            return EnchantEventHandler(self.engine)
+        self.engine.message_log.add_message("You cannot enchant items here.", colors.white)
+        return None
+
+# Main game key bindings other than movement.  Each command takes the
+# MainGameEventHandler and returns an action, a new handler, or None.
+MainKeyCommand = Callable[[MainGameEventHandler], Optional[ActionOrHandler]]
+
+MAIN_KEY_COMMANDS: Mapping[int, MainKeyCommand] = types.MappingProxyType({
+    **{key: (lambda handler: WaitAction(handler.engine.player)) for key in WAIT_KEYS},
+    tcod.event.K_v: lambda handler: HistoryViewer(handler.engine),
+    tcod.event.K_g: lambda handler: PickupAction(handler.engine.player),
+    tcod.event.K_x: lambda handler: ToggleCombatModeAction(handler.engine.player),
+    tcod.event.K_i: lambda handler: InventoryActivateHandler(handler.engine),
+    tcod.event.K_d: lambda handler: InventoryDropHandler(handler.engine),
+    tcod.event.K_e: lambda handler: EquipmentHandler(handler.engine),
+    tcod.event.K_SLASH: lambda handler: LookHandler(handler.engine),
+    tcod.event.K_c: lambda handler: CharacterScreenEventHandler(handler.engine),
+    tcod.event.K_a: lambda handler: LevelUpMenuEventHandler(handler.engine),
+    tcod.event.K_f: lambda handler: FeatSelectionEventHandler(handler.engine),
+    tcod.event.K_r: lambda handler: RenameItemEventHandler(handler.engine),
+    tcod.event.K_s: lambda handler: SaveGameEventHandler,
+    tcod.event.K_t: lambda handler: SingleRangedAttackHandler(
+        handler.engine,
+        callback = lambda xy: actions.FullAttackRangedAction(handler.engine.player, xy),
+        ),
+    tcod.event.K_b: MainGameEventHandler.buy_from_shop,
+    tcod.event.K_n: MainGameEventHandler.sell_to_shop,
+})
+
+MAIN_SHIFT_KEY_COMMANDS: Mapping[int, MainKeyCommand] = types.MappingProxyType({
+    tcod.event.K_PERIOD: lambda handler: TakeStairsAction(handler.engine.player),
+    tcod.event.K_COMMA: lambda handler: TakeStairsAction(handler.engine.player),
+    tcod.event.K_q: lambda handler: GameOverEventHandler(handler.engine),
+    tcod.event.K_SLASH: lambda handler: HelpMenuEventHandler(handler.engine),
+    tcod.event.K_s: lambda handler: CastSpellHandler(handler.engine),
+    tcod.event.K_b: lambda handler: BuffListHandler(handler.engine),
+    tcod.event.K_u: MainGameEventHandler.enchant_here,
+})
+
+CURSOR_Y_KEYS = types.MappingProxyType({
     tcod.event.K_UP: -1,
     tcod.event.K_DOWN: 1,
     tcod.event.K_PAGEUP: -10,
     tcod.event.K_PAGEDOWN: 10,
-}
+})
 
 class HistoryViewer(EventHandler):
     """Print the history on a larger window which can be navigated."""
 
+    # Log consoles by (width, height), shared by every viewer so reopening the history doesn't allocate a new one.
+    log_consoles: Dict[Tuple[int, int], tcod.Console] = {}
+
     def __init__(self, engine: Engine):
         super().__init__(engine)
         self.log_length = len(engine.message_log.messages)
         self.cursor = self.log_length - 1
+        # The log console is only redrawn when the cursor moves.
+        self.log_console: Optional[tcod.Console] = None
+        self.rendered_cursor: Optional[int] = None
 
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console) # Draw the main state as the background.
 
-        log_console = tcod.Console(console.width - 6, console.height - 6)
-
-        # Draw a frame with a custom banner title.
-        log_console.draw_frame(0, 0, log_console.width, log_console.height)
-        log_console.print_box(
-            0, 0, log_console.width, 1, "<Message history>", alignment = tcod.CENTER
-        )
+        log_size = (console.width - 6, console.height - 6)
+        log_console = HistoryViewer.log_consoles.get(log_size)
+        if log_console is None:
+            log_console = HistoryViewer.log_consoles[log_size] = tcod.Console(*log_size)
+        if log_console is not self.log_console:
+            self.log_console = log_console
+            self.rendered_cursor = None
+
+        if self.rendered_cursor != self.cursor:
+            log_console.clear()
+            # Draw a frame with a custom banner title.
+            log_console.draw_frame(0, 0, log_console.width, log_console.height)
+            log_console.print_box(
+                0, 0, log_console.width, 1, "<Message history>", alignment = tcod.CENTER
+            )
 
-        # Render the message log using the cursor parameter.
-        self.engine.message_log.render_messages(
-            log_console,
-            1,
-            1,
-            log_console.width - 2,
-            log_console.height - 2,
-            self.engine.message_log.messages[: self.cursor + 1],
-        )
+            # Render the message log using the cursor parameter.
+            self.engine.message_log.render_messages(
+                log_console,
+                1,
+                1,
+                log_console.width - 2,
+                log_console.height - 2,
+                self.engine.message_log.messages,
+                end = self.cursor + 1,
+            )
+            self.rendered_cursor = self.cursor
         log_console.blit(console, 3, 3)
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> None:
         # Fancy conditional movement to make it feel right.
-        if event.sym in CURSOR_Y_KEYS:
-            adjust = CURSOR_Y_KEYS[event.sym]
+        adjust = CURSOR_Y_KEYS.get(event.sym)
+        if adjust:
             if adjust < 0 and self.cursor == 0:
                 # Only move from the top to the bottom when you're on the edge.
                 self.cursor = self.log_length - 1
@@ -319,14 +427,7 @@ class AskUserEventHandler(EventHandler):
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[ActionOrHandler]:
         """By default any key exits this input handler."""
-        if event.sym in { # Ignore modifier keys.
-            tcod.event.K_LSHIFT,
-            tcod.event.K_RSHIFT,
-            tcod.event.K_LCTRL,
-            tcod.event.K_RCTRL,
-            tcod.event.K_LALT,
-            tcod.event.K_RALT,
-        }:
+        if event.sym in MODIFIER_KEYS: # Ignore modifier keys.
             return None
         return self.on_exit()
 
@@ -347,107 +448,159 @@ class AskUserEventHandler(EventHandler):
         """
         return MainGameEventHandler(self.engine)
 
-class GameOverEventHandler(AskUserEventHandler):
+def new_panel(width: int, height: int, title: str) -> tcod.Console:
+    """Return a new console of the given size with a titled menu frame drawn on it."""
+    panel = tcod.Console(width, height)
+    panel.draw_frame(
+        x = 0,
+        y = 0,
+        width = width,
+        height = height,
+        title = title,
+        clear = True,
+        fg = (255, 255, 255),
+        bg = (0, 0, 0),
+    )
+    return panel
+
+def fit_width(width: int, lines: List[str]) -> int:
+    """Widen a menu frame so its longest line still fits inside the border."""
+    return max([width] + [len(line) + 2 for line in lines])
+
+def new_list_panel(width: int, title: str, lines: List[str]) -> tcod.Console:
+    """Return a menu panel showing one line per entry, or "(Empty)" if there are none."""
+    width = fit_width(width, lines)
+    height = max(3, len(lines) + 2)
+    panel = new_panel(width, height, title)
+    panel.print_box(1, 1, width - 2, height - 2, "\n".join(lines) or "(Empty)")
+    return panel
+
+@functools.lru_cache(maxsize = None)
+def empty_list_panel(width: int, title: str) -> tcod.Console:
+    """Return the shared "(Empty)" panel for a menu.  Only ever blitted, never drawn on."""
+    return new_list_panel(width, title, [])
+
+def item_sell_lines(player: Actor) -> List[str]:
+    """Return the inventory lines shown at shops, with each item's sell price."""
+    lines = []
+    equipped_labels = equipped_item_labels(player.equipment)
+    for i, item in enumerate(player.inventory.items):
+        item_key = LOWER_LETTERS[i]
+        equip_status = equipped_labels.get(id(item), "")
+        num_of_items = ""
+        sell_price = item.sell_price
+        if item.number_in_stack > 1:
+            num_of_items = f" ({item.number_in_stack})"
+        lines.append(f"({item_key}) {item.name}{num_of_items}{equip_status} Sell price: {sell_price} gold.")
+    return lines
+
+class PanelEventHandler(AskUserEventHandler):
+    """A menu drawn into its own console, then blitted over the map each frame.
+
+    What a menu shows only changes when the player presses a key or clicks, so the panel is
+    drawn again after those events and reused for every other frame.
+    """
+
+    panel: Optional[Tuple[int, int, tcod.Console]] = None
+    redraw_on_input = True # False for read-only screens, which are drawn once when opened.
+
+    def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
+        if self.redraw_on_input and isinstance(event, (tcod.event.KeyDown, tcod.event.MouseButtonDown)):
+            self.panel = None
+        return super().handle_events(event)
 
     def on_render(self, console: tcod.Console) -> None:
-        """Screen to confirm quit command."""
         super().on_render(console)
+        if self.panel is None:
+            self.panel = self.draw_panel()
+        x, y, panel = self.panel
+        panel.blit(console, x, y)
 
-        x = 0
-        y = 0
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
+        """Draw the menu into a new console and return (x, y, console)."""
+        raise NotImplementedError()
+
+class StaticMenuEventHandler(PanelEventHandler):
+    """A menu whose frame and text don't change while it is open."""
+
+    redraw_on_input = False
+
+    menu_width = 80
+    menu_height = 10
+    menu_title = "Select an Option"
+    menu_text = ""
+
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
+        panel = new_panel(self.menu_width, self.menu_height, self.menu_title)
+        panel.print_box(1, 1, self.menu_width - 2, self.menu_height - 2, self.menu_text)
+        return 0, 0, panel
+
+GAME_OVER_TEXT = "\n".join((
+    "Do you really wish to quit?  Progress will not be saved.",
+    "'Esc' to quit, any other key to return to game.",
+))
+
+class GameOverEventHandler(StaticMenuEventHandler):
+
+    menu_height = 4
+    menu_title = 'Quit the game?'
+    menu_text = GAME_OVER_TEXT
 
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = 80,
-            height = 4,
-            title = 'Quit the game?',
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
-        console.print(x + 1, y + 1, f"Do you really wish to quit?  Progress will not be saved.")
-        console.print(x + 1, y + 2, f"'Esc' to quit, any other key to return to game.")
-        
     def ev_keydown(self, event: tcod.event.KeyDown) -> None:
         if event.sym == tcod.event.K_ESCAPE:
             raise SystemExit()
         else:
             return MainGameEventHandler(self.engine)
 
-class HelpMenuEventHandler(AskUserEventHandler):
-    """Displays Help Menu, with keypress uses.  Any key to abort."""
+HELP_LINES = (
+    "Press Shift for capital letter choices.",
+    "Arrows or Number Keys 1-9 to move/attack.",
+    "'a': Level Up Screen.",
+    "'b': (B)uy from shop.",
+    "'c': Display (C)haracter screen (Your stats)",
+    "'d': (D)rop an item from inventory to ground.",
+    "'e': (E)quipment screen.  Can remove worn gear.",
+    "'f': Choose (F)eats, or see available feats.",
+    "'g': (G)et item from floor.",
+    "'i': (I)nventory display.  Then equip or use items.",
+    "'n': Sell an item to shop.",
+    "'r': (R)ename item in inventory.",
+    "'s': (S)ave game.",
+    "'t': (T)hrow or Shoot ranged weapon.",
+    "'v': (V)iew message history.  Can scroll though past messages.",
+    "'x':  e(X)change melee and ranged weapons.",
+    "'B': Display current (B)uffs on character.",
+    "'Q': (Q)uit game: (Esc) to confirm.  Will not save.",
+    "'S': (S)pell selection screen, cast spells.",
+    "'U': Enchant item in inventory at enchanter's shop.",
+    "'/': Look at monster, item, or feature.",
+    "'<', '>': Take stairs.",
+    "'.', '5': Wait one turn.",
+    "'?', This Help screen.",
+)
+HELP_TEXT = "\n".join(HELP_LINES)
 
-    def on_render(self, console: tcod.Console) -> None:
-        """Screen with Help Menu."""
-        super().on_render(console)
+class HelpMenuEventHandler(StaticMenuEventHandler):
+    """Displays Help Menu, with keypress uses.  Any key to abort."""
 
-        x = 0
-        y = 0
-
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = 80,
-            height = 40,
-            title = 'Help Menu: Available Buttons:  Any Key to return to game.',
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
-        console.print(x + 1, y + 1, f"Press Shift for capital letter choices.")
-        console.print(x + 1, y + 2, f"Arrows or Number Keys 1-9 to move/attack.")
-        console.print(x + 1, y + 3, f"'a': Level Up Screen.")
-        console.print(x + 1, y + 4, f"'b': (B)uy from shop.")
-        console.print(x + 1, y + 5, f"'c': Display (C)haracter screen (Your stats)")
-        console.print(x + 1, y + 6, f"'d': (D)rop an item from inventory to ground.")
-        console.print(x + 1, y + 7, f"'e': (E)quipment screen.  Can remove worn gear.")
-        console.print(x + 1, y + 8, f"'f': Choose (F)eats, or see available feats.")
-        console.print(x + 1, y + 9, f"'g': (G)et item from floor.")
-        console.print(x + 1, y + 10, f"'i': (I)nventory display.  Then equip or use items.")
-        console.print(x + 1, y + 11, f"'n': Sell an item to shop.")
-        console.print(x + 1, y + 12, f"'r': (R)ename item in inventory.")
-        console.print(x + 1, y + 13, f"'s': (S)ave game.")
-        console.print(x + 1, y + 14, f"'t': (T)hrow or Shoot ranged weapon.")
-        console.print(x + 1, y + 15, f"'v': (V)iew message history.  Can scroll though past messages.")
-        console.print(x + 1, y + 16, f"'x':  e(X)change melee and ranged weapons.")
-        console.print(x + 1, y + 17, f"'B': Display current (B)uffs on character.")
-        console.print(x + 1, y + 18, f"'Q': (Q)uit game: (Esc) to confirm.  Will not save.")
-        console.print(x + 1, y + 19, f"'S': (S)pell selection screen, cast spells.")
-        console.print(x + 1, y + 20, f"'U': Enchant item in inventory at enchanter's shop.")
-        console.print(x + 1, y + 21, f"'/': Look at monster, item, or feature.")
-        console.print(x + 1, y + 22, f"'<', '>': Take stairs.")
-        console.print(x + 1, y + 23, f"'.', '5': Wait one turn.")
-        console.print(x + 1, y + 24, f"'?', This Help screen.")
+    menu_height = 40
+    menu_title = 'Help Menu: Available Buttons:  Any Key to return to game.'
+    menu_text = HELP_TEXT
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> None:
             return MainGameEventHandler(self.engine)
 
-class TownPortalEventHandler(AskUserEventHandler):
-    """Handles town portal to/from town.  Esc to abort, Q to use."""
-
-    def on_render(self, console: tcod.Console) -> None:
-        """Screen to confirm or abort town portal."""
-        super().on_render(console)
+TOWN_PORTAL_TEXT = "\n".join((
+    "You have activated a town portal.",
+    "'Y' to confirm, 'Esc' to abort.",
+))
 
-        x = 0
-        y = 0
+class TownPortalEventHandler(StaticMenuEventHandler):
+    """Handles town portal to/from town.  Esc to abort, Q to use."""
 
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = 80,
-            height = 10,
-            title = 'Select an Option',
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
-        console.print(x + 1, y + 1, f"You have activated a town portal.")
-        console.print(x + 1, y + 2, f"'Y' to confirm, 'Esc' to abort.")
+    menu_text = TOWN_PORTAL_TEXT
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[ActionOrHandler]:
-        from loader_functions.initialize_new_game import get_constants
         constants = get_constants()
         player = self.engine.player
         engine = self.engine
@@ -482,34 +635,21 @@ class TownPortalEventHandler(AskUserEventHandler):
                 engine.update_fov()
                 return MainGameEventHandler(engine)
 
-class StartMenuEventHandler(AskUserEventHandler):
+START_MENU_TEXT = "\n".join((
+    "Hit 'Z' to load saved game,",
+    "'N' for new Dwarf Fighter,",
+    "'H' for new Human Fighter,",
+    "'W' for new Elf Wizard,",
+    "'G' for graphics testing,",
+    "or 'Esc' to quit.",
+))
+
+class StartMenuEventHandler(StaticMenuEventHandler):
     """Selects New game or Loads save.  Esc to quit."""
     """No longer used, see setup_game."""
 
-    def on_render(self, console: tcod.Console) -> None:
-        """Displays New Game/Load Game selection screen.
-        """
-        super().on_render(console)
-
-        x = 0
-        y = 0
-
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = 40,
-            height = 10,
-            title = 'Select an Option',
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
-        console.print(x + 1, y + 1, "Hit 'Z' to load saved game,")
-        console.print(x + 1, y + 2, "'N' for new Dwarf Fighter,")
-        console.print(x + 1, y + 3, "'H' for new Human Fighter,")
-        console.print(x + 1, y + 4, "'W' for new Elf Wizard,")
-        console.print(x + 1, y + 5, "'G' for graphics testing,")
-        console.print(x + 1, y + 6, "or 'Esc' to quit.")
+    menu_width = 40
+    menu_text = START_MENU_TEXT
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[ActionOrHandler]:
         player = self.engine.player
@@ -527,30 +667,21 @@ class StartMenuEventHandler(AskUserEventHandler):
         elif key == tcod.event.K_ESCAPE:
             raise SystemExit()
 
-class UseBagHandler(AskUserEventHandler):
+USE_BAG_TEXT = "\n".join((
+    "Press 'p' to place an item in the bag.",
+    "Press 't' to take an item from the bag.",
+    "Press 'Esc' to abort.",
+))
+
+class UseBagHandler(StaticMenuEventHandler):
     """Uses a Bag, take item out or put item in."""
 
-    def on_render(self, console: tcod.Console) -> None:
-        """Just displays take out or put in options."""
-        super().on_render(console)
+    menu_height = 20
+    menu_text = USE_BAG_TEXT
 
-        player = self.engine.player
-        x = 0
-        y = 0
-
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = 80,
-            height = 20,
-            title = f"{player.name}'s Bag use.",
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
-        console.print(x + 1, y + 1, "Press 'p' to place an item in the bag.")
-        console.print(x + 1, y + 2, "Press 't' to take an item from the bag.")
-        console.print(x + 1, y + 3, "Press 'Esc' to abort.")
+    @property
+    def menu_title(self) -> str:
+        return f"{self.engine.player.name}'s Bag use."
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -567,9 +698,68 @@ class UseBagHandler(AskUserEventHandler):
         if key == tcod.event.K_q or key == tcod.event.K_ESCAPE:
             return MainGameEventHandler(self.engine)
         
+def cast_self_buff(engine: Engine, spell: str) -> ActionOrHandler:
+    return CastSelfBuffAction(engine.player, spell)
+
+def cast_self_heal(engine: Engine, spell: str) -> ActionOrHandler:
+    return CastSelfHealAction(engine.player, spell)
+
+def cast_magic_missile(engine: Engine, spell: str) -> ActionOrHandler:
+    return SingleRangedAttackHandler(
+        engine,
+        callback = lambda xy: actions.CastMagicMissileAction(engine.player, xy),
+        )
+
+def cast_shocking_grasp(engine: Engine, spell: str) -> ActionOrHandler:
+    return SingleMeleeAttackHandler(
+        engine,
+        callback = lambda xy: actions.CastShockingGraspAction(engine.player, xy),
+        )
+
+def cast_ray_of_enfeeblement(engine: Engine, spell: str) -> ActionOrHandler:
+    return SingleRangedAttackHandler(
+        engine,
+        callback = lambda xy: actions.CastRayOfEnfeeblementAction(engine.player, xy),
+        )
+
+def cast_summon_monster(engine: Engine, spell: str) -> ActionOrHandler:
+    mana = engine.player.battler.spells[spell]
+    return SummonMonsterHandler(
+        engine,
+        callback = lambda xy: actions.SummonMonsterAction(engine.player, xy, spell, mana),
+        )
+
+# Spell name -> function(engine, spell name) returning the action or targeting handler.
+SPELL_DISPATCH: Dict[str, Callable[[Engine, str], ActionOrHandler]] = {
+    "Mage Armor": cast_self_buff,
+    "Shield": cast_self_buff,
+    "Magic Weapon": cast_self_buff,
+    "Alter Self": cast_self_buff,
+    "Magic Missile": cast_magic_missile,
+    "Shocking Grasp": cast_shocking_grasp,
+    "Ray of Enfeeblement": cast_ray_of_enfeeblement,
+    "Cure Light Wounds": cast_self_heal,
+    "Cure Moderate Wounds": cast_self_heal,
+    "Cure Serious Wounds": cast_self_heal,
+    "Cure Critical Wounds": cast_self_heal,
+    "Summon Monster 1": cast_summon_monster,
+    "Summon Monster 2": cast_summon_monster,
+    "Summon Monster 3": cast_summon_monster,
+}
+
 class CastSpellHandler(AskUserEventHandler):
     """Casts a spell known"""
 
+    def __init__(self, engine: Engine):
+        super().__init__(engine)
+        # Spells can't be learned while this menu is open, so the sorted list and menu lines are built once.
+        spells = engine.player.battler.spells
+        self.current_spells_list = sorted(spells)
+        self.spell_lines = tuple(
+            f"Press '{LOWER_LETTERS[i]}' for {spell}: {spells[spell]} Mana."
+            for i, spell in enumerate(self.current_spells_list)
+        )
+
     def on_render(self, console: tcod.Console) -> None:
         """Displays available spells and mana costs."""
         super().on_render(console)
@@ -589,54 +779,29 @@ class CastSpellHandler(AskUserEventHandler):
             bg = (0, 0, 0),
         )
         y_hold = 2
-        if len(list(player.battler.spells)) == 0:
+        if len(self.current_spells_list) == 0:
             console.print(x + 1, y_hold, "You know no spells.  Esc or Q to quit")
         else:
             console.print(x + 1, y_hold, f"Select a letter to cast spell, Esc or Q to quit")
             y_hold += 1
             console.print(x + 1, y_hold, f"You currently have {player.battler.mana} mana remaining")
-            current_spells_list = list(player.battler.spells)
-            current_spells_list.sort()
-            for i in range(len(current_spells_list)):
+            for line in self.spell_lines:
                 y_hold += 1
-                console.print(x + 1, y_hold, f"Press '{chr(i+97)}' for {current_spells_list[i]}: {player.battler.spells[current_spells_list[i]]} Mana.")
+                console.print(x + 1, y_hold, line)
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
         ) -> Optional[ActionOrHandler]:
-        player = self.engine.player
         key = event.sym
 
-        current_spells_list = list(player.battler.spells)
-        current_spells_list.sort()
+        current_spells_list = self.current_spells_list
         letter_found = key - 97
 
         if letter_found in range(len(current_spells_list)):
-            if current_spells_list[letter_found] in ("Mage Armor", "Shield", "Magic Weapon", "Alter Self"):
-                return CastSelfBuffAction(player, current_spells_list[letter_found])
-            elif current_spells_list[letter_found] in ("Magic Missile"):
-                return SingleRangedAttackHandler(
-                    self.engine,
-                    callback = lambda xy: actions.CastMagicMissileAction(self.engine.player, xy),
-                    )
-            elif current_spells_list[letter_found] in ("Shocking Grasp"):
-                return SingleMeleeAttackHandler(
-                    self.engine,
-                    callback = lambda xy: actions.CastShockingGraspAction(self.engine.player, xy),
-                    )
-            elif current_spells_list[letter_found] in ("Ray of Enfeeblement"):
-                return SingleRangedAttackHandler(
-                    self.engine,
-                    callback = lambda xy: actions.CastRayOfEnfeeblementAction(self.engine.player, xy),
-                    )
-            elif current_spells_list[letter_found] in ("Cure Light Wounds", "Cure Moderate Wounds", "Cure Serious Wounds", "Cure Critical Wounds"):
-                return CastSelfHealAction(player, current_spells_list[letter_found])
-            elif current_spells_list[letter_found] in ("Summon Monster 1", "Summon Monster 2", "Summon Monster 3"):
-                mana = player.battler.spells[current_spells_list[letter_found]]
-                return SummonMonsterHandler(
-                    self.engine,
-                    callback = lambda xy: actions.SummonMonsterAction(self.engine.player, xy, current_spells_list[letter_found], mana),
-                    )
+            spell = current_spells_list[letter_found]
+            cast = SPELL_DISPATCH.get(spell)
+            if cast:
+                return cast(self.engine, spell)
 
         if key == tcod.event.K_ESCAPE:
             return MainGameEventHandler(self.engine)
@@ -645,6 +810,21 @@ class CastSpellHandler(AskUserEventHandler):
 class FeatSelectionEventHandler(AskUserEventHandler):
     """Selects new feats.  Esc or Q to quit."""
 
+    def __init__(self, engine: Engine):
+        super().__init__(engine)
+        self.rebuild_feat_list()
+
+    def rebuild_feat_list(self) -> None:
+        """Work out which feats the player can take.  Call again after feats or stats change."""
+        player = self.engine.player
+        taken_once_feats, taken_multiple_feats = get_all_feats()
+        taken_once_names, taken_multiple_names = get_feat_names()
+        combined_feats = {**taken_once_feats, **taken_multiple_feats}
+        possible_feats = (taken_once_names - player.battler.combat_feats.keys()) | taken_multiple_names
+        self.main_feats_list = sorted(
+            feat for feat in possible_feats if get_feat_reqs(player, combined_feats[feat])
+        )
+
     def on_render(self, console: tcod.Console) -> None:
         """Displays feat selection screen."""
         super().on_render(console)
@@ -667,31 +847,20 @@ class FeatSelectionEventHandler(AskUserEventHandler):
         console.print(x + 1, y_hold, f"Select a letter to learn feat or improve stat, Esc or Q to quit.")
         y_hold += 1
         console.print(x + 1, y_hold, f"You have {player.battler.feats_to_take} feats to learn, and {player.battler.stats_to_take} stat points to spend.")
-        current_feats_list = list(player.battler.combat_feats)
-        for i in range(len(current_feats_list)):
+        for feat, times_taken in player.battler.combat_feats.items():
             y_hold += 1
-            if player.battler.combat_feats[current_feats_list[i]] > 1:
-                console.print(x + 1, y_hold, f"Known feat: {current_feats_list[i]} (X{player.battler.combat_feats[current_feats_list[i]]})")
+            if times_taken > 1:
+                console.print(x + 1, y_hold, f"Known feat: {feat} (X{times_taken})")
             else:
-                console.print(x + 1, y_hold, f"Known feat: {current_feats_list[i]}.")
+                console.print(x + 1, y_hold, f"Known feat: {feat}.")
         y_hold += 2
-        taken_once_feats, taken_multiple_feats = get_all_feats()
-        combined_feats = {**taken_once_feats, **taken_multiple_feats}
-        taken_multiple_feats_list = list(taken_multiple_feats)
-        taken_once_feats_list = list(taken_once_feats)
-        possible_feats_list = list((set(taken_once_feats_list) - set(current_feats_list))|set(taken_multiple_feats_list))
-        main_feats_list = copy.deepcopy(possible_feats_list)
-        for i in range(len(possible_feats_list)):
-            if get_feat_reqs(player, combined_feats[possible_feats_list[i]]) == False:
-                main_feats_list.remove(possible_feats_list[i])
-        main_feats_list.sort()
-        for j in range(len(main_feats_list)):
+        main_feats_list = self.main_feats_list
+        for j, feat in enumerate(main_feats_list):
             y_hold += 1
-            console.print(x + 1, y_hold, f"Select '{chr(j+97)}' to learn {main_feats_list[j]}.")
-        stat = list(["Str","Dex","Con","Int","Wis","Cha"])
-        for k in range(6):
+            console.print(x + 1, y_hold, f"Select '{LOWER_LETTERS[j]}' to learn {feat}.")
+        for k, stat in enumerate(("Str", "Dex", "Con", "Int", "Wis", "Cha"), start = len(main_feats_list)):
             y_hold += 1
-            console.print(x + 1, y_hold, f"Select '{chr(len(main_feats_list)+k+97)}' to gain {stat[k]}.")
+            console.print(x + 1, y_hold, f"Select '{LOWER_LETTERS[k]}' to gain {stat}.")
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -699,17 +868,7 @@ class FeatSelectionEventHandler(AskUserEventHandler):
         player = self.engine.player
         key = event.sym
 
-        current_feats_list = list(player.battler.combat_feats)
-        taken_once_feats, taken_multiple_feats = get_all_feats()
-        combined_feats = {**taken_once_feats, **taken_multiple_feats}
-        taken_multiple_feats_list = list(taken_multiple_feats)
-        taken_once_feats_list = list(taken_once_feats)
-        possible_feats_list = list((set(taken_once_feats_list) - set(current_feats_list))|set(taken_multiple_feats_list))
-        main_feats_list = copy.deepcopy(possible_feats_list)
-        for i in range(len(possible_feats_list)):
-            if get_feat_reqs(player, combined_feats[possible_feats_list[i]]) == False:
-                main_feats_list.remove(possible_feats_list[i])
-        main_feats_list.sort()
+        main_feats_list = self.main_feats_list
         letter_found = key - 97
 
         if player.battler.feats_to_take > 0:
@@ -739,47 +898,40 @@ class FeatSelectionEventHandler(AskUserEventHandler):
                     player.battler.charisma += 1
                 else:
                     raise Impossible(f"This statistic does not exist.")
-                
+                # A higher stat can unlock feats.
+                self.rebuild_feat_list()
 
         if key == tcod.event.K_q or key == tcod.event.K_ESCAPE:
             return MainGameEventHandler(self.engine)
 
-class BuffListHandler(AskUserEventHandler):
+class BuffListHandler(PanelEventHandler):
     """Displays Buffs and durations.  No interaction.  Esc to quit."""
 
-    def on_render(self, console: tcod.Console) -> None:
+    redraw_on_input = False
+
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
         """Display character's buff list.
         """
-        super().on_render(console)
-
         x = 0
         y = 0
         player = self.engine.player
 
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = 80,
-            height = 20,
-            title = f"{player.name}'s current buffs.",
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
+        panel = new_panel(80, 20, f"{player.name}'s current buffs.")
         y_hold = y + 1
 
-        console.print(x + 1, y_hold, f"{player.name}'s Buffs: (Turn is now {self.engine.current_turn})")
+        current_turn = self.engine.current_turn
+        current_buffs = player.battler.current_buffs
+        panel.print(x + 1, y_hold, f"{player.name}'s Buffs: (Turn is now {current_turn})")
         y_hold += 1
-        if len(list(player.battler.current_buffs)) == 0:
+        if not current_buffs:
             y_hold += 1
-            console.print(x + 1, y_hold, f"You have no buffs active.")
+            panel.print(x + 1, y_hold, f"You have no buffs active.")
         else:
-            buffs = list(player.battler.current_buffs)
-            buffs.sort()
-            for i in range(len(buffs)):
+            for name, expiry in sorted(current_buffs.items()):
                 y_hold += 1
-                console.print(x + 1, y_hold, f"{buffs[i]}: {player.battler.current_buffs[buffs[i]] - self.engine.current_turn} turns remaining.")
-        console.print(x + 1, y_hold + 2, f"'Esc' or 'Q' to quit.")
+                panel.print(x + 1, y_hold, f"{name}: {expiry - current_turn} turns remaining.")
+        panel.print(x + 1, y_hold + 2, f"'Esc' or 'Q' to quit.")
+        return x, y, panel
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -790,52 +942,61 @@ class BuffListHandler(AskUserEventHandler):
         if key == tcod.event.K_ESCAPE or key == tcod.event.K_q:
             return MainGameEventHandler(self.engine)
 
-class CharacterScreenEventHandler(AskUserEventHandler):
+class CharacterScreenEventHandler(PanelEventHandler):
     """Displays character statistics.  No interaction.  Esc to quit."""
 
-    def on_render(self, console: tcod.Console) -> None:
+    redraw_on_input = False
+
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
         """Display character screen.
         """
-        super().on_render(console)
-
         x = 0
         y = 0
         player = self.engine.player
+        battler = player.battler
+        level = player.level
+        main_hand = player.equipment.main_hand
+        ranged = player.equipment.ranged
 
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = 80,
-            height = 20,
-            title = f"{player.name}'s vital statistics",
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
-        console.print(x + 1, y + 1, f"Character Information")
-        console.print(x + 1, y + 2, f"{player.name}: Level {player.level.current_level} {player.battler.hit_dice}.")
-        console.print(x + 1, y + 3, f"Experience: {player.level.current_xp}.")
-        console.print(x + 1, y + 4, f"Experience to Level: {player.level.experience_to_next_level}.")
-        console.print(x + 1, y + 6, f"Maximum HP: {player.battler.max_hp}.  Maximum Mana: {player.battler.max_mana}")
-        if player.equipment.main_hand == None:
-            console.print(x + 1, y + 7, f"Melee Damage: {player.battler.unarmed_num_dice}d{player.battler.unarmed_size_dice} + {player.battler.melee_to_damage} (+{player.battler.melee_to_hit} to hit).")
+        if main_hand is None:
+            melee_line = f"Melee Damage: {battler.unarmed_num_dice}d{battler.unarmed_size_dice} + {battler.melee_to_damage} (+{battler.melee_to_hit} to hit)."
         else:
-            console.print(x + 1, y + 7, f"Melee Damage: {player.equipment.main_hand.equippable.weapon_num_dice}d{player.equipment.main_hand.equippable.weapon_size_dice} + {player.battler.melee_to_damage}. (+{player.battler.melee_to_hit} to hit.)")
-        console.print(x + 1, y + 9, f"Strength: {player.battler.current_str}({player.battler.strength}). Dexterity: {player.battler.current_dex}({player.battler.dexterity}).  Constitution: {player.battler.current_con}({player.battler.constitution}).")
-        console.print(x + 1, y + 10, f"Intelligence: {player.battler.current_int}({player.battler.intelligence}).  Wisdom: {player.battler.current_wis}({player.battler.wisdom}).  Charisma: {player.battler.current_cha}({player.battler.charisma}).")
-        if player.equipment.ranged != None:
-            console.print(x + 1, y + 12, f"Ranged Damage: {player.equipment.ranged.equippable.weapon_num_dice}d{player.equipment.ranged.equippable.weapon_size_dice} + {player.battler.ranged_to_damage}. (+{player.battler.ranged_to_hit} to hit.)")
-        console.print(x + 1, y + 14, f"AC: {player.battler.current_ac}. Dex to AC: {player.battler.dex_to_ac}.")
-        console.print(x + 1, y + 16, f"BAB: +{player.battler.bab}. Saves: Fort: (+{player.battler.fort_save}), Reflex: (+{player.battler.reflex_save}), Will: (+{player.battler.will_save}).")
-
-        feats_string = "Feats: "
-        if len(player.battler.combat_feats) == 0:
-            feats_string = feats_string + "None."
+            main_hand_weapon = main_hand.equippable
+            melee_line = f"Melee Damage: {main_hand_weapon.weapon_num_dice}d{main_hand_weapon.weapon_size_dice} + {battler.melee_to_damage}. (+{battler.melee_to_hit} to hit.)"
+        ranged_line = ""
+        if ranged is not None:
+            ranged_weapon = ranged.equippable
+            ranged_line = f"Ranged Damage: {ranged_weapon.weapon_num_dice}d{ranged_weapon.weapon_size_dice} + {battler.ranged_to_damage}. (+{battler.ranged_to_hit} to hit.)"
+
+        if battler.combat_feats:
+            feats_string = "Feats: " + " ".join(battler.combat_feats)
         else:
-            current_feats_list = list(player.battler.combat_feats)
-            for i in range(len(current_feats_list)):
-                feats_string += current_feats_list[i] + " "
-        console.print(x + 1, y + 18, feats_string)
+            feats_string = "Feats: None."
+
+        # One line per row, blank strings keep the gaps between sections.
+        lines = (
+            f"Character Information",
+            f"{player.name}: Level {level.current_level} {battler.hit_dice}.",
+            f"Experience: {level.current_xp}.",
+            f"Experience to Level: {level.experience_to_next_level}.",
+            "",
+            f"Maximum HP: {battler.max_hp}.  Maximum Mana: {battler.max_mana}",
+            melee_line,
+            "",
+            f"Strength: {battler.current_str}({battler.strength}). Dexterity: {battler.current_dex}({battler.dexterity}).  Constitution: {battler.current_con}({battler.constitution}).",
+            f"Intelligence: {battler.current_int}({battler.intelligence}).  Wisdom: {battler.current_wis}({battler.wisdom}).  Charisma: {battler.current_cha}({battler.charisma}).",
+            "",
+            ranged_line,
+            "",
+            f"AC: {battler.current_ac}. Dex to AC: {battler.dex_to_ac}.",
+            "",
+            f"BAB: +{battler.bab}. Saves: Fort: (+{battler.fort_save}), Reflex: (+{battler.reflex_save}), Will: (+{battler.will_save}).",
+            "",
+            feats_string,
+        )
+        panel = new_panel(80, 20, f"{player.name}'s vital statistics")
+        panel.print_box(1, 1, 78, 18, "\n".join(lines))
+        return x, y, panel
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -846,6 +1007,20 @@ class CharacterScreenEventHandler(AskUserEventHandler):
         if key == tcod.event.K_ESCAPE or key == tcod.event.K_q:
             return MainGameEventHandler(self.engine)
             
+@functools.lru_cache(maxsize = None)
+def level_up_gains(hit_dice: str, new_level: int) -> Tuple[bool, int, int]:
+    """Return (bab_increases, feats_gained, stat_points_gained) for reaching new_level."""
+    if hit_dice == "Fighter":
+        bab_increases = True
+        feats_gained = 1 # Fighters get feats every level
+    else:
+        bab_increases = hit_dice == "Wizard" and new_level % 2 == 1
+        feats_gained = 1 if new_level % 2 == 1 else 0
+        if hit_dice == "Wizard" and new_level % 5 == 0:
+            feats_gained += 1
+    stat_points_gained = 1 if new_level % 4 == 0 else 0
+    return bab_increases, feats_gained, stat_points_gained
+
 class LevelUpMenuEventHandler(AskUserEventHandler):
     """Selects level up stat gain.  Escape or Q to leave."""
 
@@ -867,27 +1042,19 @@ class LevelUpMenuEventHandler(AskUserEventHandler):
             fg = (255, 255, 255),
             bg = (0, 0, 0),
         )
-        feats_gained = 0
-        next_level = self.engine.player.level.current_level + 1
-        if self.engine.player.level.current_xp >= self.engine.player.level.experience_to_next_level:
-            console.print(x + 1, y + 1, f"Congratulations! You are now level {self.engine.player.level.current_level + 1}!")
+        battler = self.engine.player.battler
+        level = self.engine.player.level
+        next_level = level.current_level + 1
+        if level.current_xp >= level.experience_to_next_level:
+            bab_increases, feats_gained, stat_points_gained = level_up_gains(battler.hit_dice, next_level)
+            console.print(x + 1, y + 1, f"Congratulations! You are now level {next_level}!")
             console.print(x + 1, y + 2, f"Max hps increase by placeholder!")
-            if self.engine.player.battler.hit_dice == "Fighter":
+            if bab_increases:
                 console.print(x + 1, y + 3, f"Base Attack Bonus (BAB) increases by 1!")
-            elif self.engine.player.battler.hit_dice == "Wizard":
-                if (next_level) % 2 == 1:
-                    console.print(x + 1, y + 3, f"Base Attack Bonus (BAB) increases by 1!")
-            if self.engine.player.battler.hit_dice == "Fighter":
-                feats_gained += 1
-            elif (next_level) % 2 == 1:
-                feats_gained += 1
-            if self.engine.player.battler.hit_dice == "Wizard":
-                if (next_level) % 5 == 0:
-                    feats_gained += 1
             if feats_gained > 0:
                 console.print(x + 1, y + 4, f"You gain {feats_gained} feat(s) to learn!")
-            if next_level % 4 == 0:
-                console.print(x + 1, y + 5, f"You have {self.engine.player.battler.stats_to_take+1} stat points to spend.")
+            if stat_points_gained > 0:
+                console.print(x + 1, y + 5, f"You have {battler.stats_to_take + stat_points_gained} stat points to spend.")
         else:
             console.print(x + 1, y + 1, f"You do not have sufficient experience to level.")
 
@@ -904,59 +1071,46 @@ class LevelUpMenuEventHandler(AskUserEventHandler):
                 self.engine.player.battler.hp = self.engine.player.battler.max_hp
                 player.level.current_xp -= player.level.experience_to_next_level
                 player.level.current_level += 1
-                if player.level.current_level % 4 == 0:
-                    self.engine.player.battler.stats_to_take += 1
-                if player.battler.hit_dice == "Fighter":
-                    self.engine.player.battler.feats_to_take += 1 #Fighters get feats every level
-                elif player.level.current_level % 2 == 1:
-                    self.engine.player.battler.feats_to_take += 1
-                if player.battler.hit_dice == "Wizard":
-                    if player.level.current_level % 5 == 0:
-                        self.engine.player.battler.feats_to_take += 1
+                _, feats_gained, stat_points_gained = level_up_gains(player.battler.hit_dice, player.level.current_level)
+                player.battler.stats_to_take += stat_points_gained
+                player.battler.feats_to_take += feats_gained
                 player.battler.hp = player.battler.max_hp
                 player.battler.mana = player.battler.max_mana
             return MainGameEventHandler(self.engine)        
 
-class ShopBuyEventHandler(AskUserEventHandler):
+class ShopBuyEventHandler(PanelEventHandler):
     """This handler selects items to buy from a shop."""
 
 
     TITLE = "Shop items for sale"
+    WIDTH = max(40, len(TITLE)) + 4
 
-    def on_render(self, console: tcod.Console) -> None:
-        super().on_render(console)
-        for shop in self.engine.game_map.shops:
-            if shop.x == self.engine.player.x and shop.y == self.engine.player.y:
-                number_of_items_for_sale = len(shop.for_sale)
-                items_for_sale = shop.for_sale
+    def __init__(self, engine: Engine):
+        super().__init__(engine)
+        # The player can't move while shopping, so look the shop up once.
+        player = engine.player
+        self.shop = engine.game_map.get_shop_at_location(player.x, player.y)
 
-        height = number_of_items_for_sale + 2
+    def items_for_sale(self) -> List[Item]:
+        """Return the stock of the shop the player is standing on."""
+        if self.shop is None:
+            return []
+        return self.shop.for_sale
 
-        if height <= 3:
-            height = 3
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
+        items_for_sale = self.items_for_sale()
 
-        width = max(40, len(self.TITLE)) + 4
+        width = self.WIDTH
 
         x = 0
         y = 0
 
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = width,
-            height = height,
-            title = self.TITLE,
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
+        lines = []
+        for i, item in enumerate(items_for_sale):
+            item_key = LOWER_LETTERS[i]
+            lines.append(f"({item_key}) {item.name} ${item.gold_value}")
 
-        if number_of_items_for_sale > 0:
-            for i, item in enumerate(items_for_sale):
-                item_key = chr(ord("a") + i)
-                console.print(x + 1, y + i + 1, f"({item_key}) {item.name} ${item.gold_value}")
-        else:
-            console.print(x + 1, y + 1, "(Empty)")
+        return x, y, new_list_panel(width, self.TITLE, lines)
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -964,17 +1118,13 @@ class ShopBuyEventHandler(AskUserEventHandler):
         player = self.engine.player
         key = event.sym
         index = key - tcod.event.K_a
-        for shop in self.engine.game_map.shops:
-            if shop.x == self.engine.player.x and shop.y == self.engine.player.y:
-                number_of_items_for_sale = len(shop.for_sale)
-                items_for_sale = shop.for_sale
-
-        if 0 <= index <= 26:
-            try:
-                selected_item = items_for_sale[index]
-            except IndexError:
-                self.engine.message_log.add_message("Invalid entry.", colors.invalid)
-                return None
+        items_for_sale = self.items_for_sale()
+
+        if len(items_for_sale) <= index < 26:
+            self.engine.message_log.add_message("Invalid entry.", colors.invalid)
+            return None
+        if 0 <= index < 26:
+            selected_item = items_for_sale[index]
             return self.buy_item(selected_item, player)
         return super().ev_keydown(event)
 
@@ -985,15 +1135,14 @@ class ShopBuyEventHandler(AskUserEventHandler):
         if len(player.inventory.items) >= player.inventory.capacity:
             raise exceptions.Impossible("Your inventory is full")
         elif player.battler.gold >= item.gold_value:
-            stacking = False
-            for i in range(len(player.inventory.items)):
-                if player.inventory.items[i].name == item.name:
-                    if item.can_stack == True:
-                        player.inventory.items[i].number_in_stack += 1
-                        stacking = True
-                        self.engine.message_log.add_message(f"You buy another {item.name} for {item.gold_value} gold.", colors.yellow)
-            if stacking == False:
-                clone_item = copy.deepcopy(item)
+            stack = None
+            if item.can_stack:
+                stack = next((held for held in player.inventory.items if held.name == item.name), None)
+            if stack is not None:
+                stack.number_in_stack += 1
+                self.engine.message_log.add_message(f"You buy another {item.name} for {item.gold_value} gold.", colors.yellow)
+            else:
+                clone_item = item.clone()
                 clone_item.parent = player.inventory
                 player.inventory.items.append(clone_item)
                 self.engine.message_log.add_message(f"You buy {item.name} for {item.gold_value} gold.", colors.yellow)
@@ -1001,21 +1150,14 @@ class ShopBuyEventHandler(AskUserEventHandler):
         else :
             self.engine.message_log.add_message("You don't have the gold for that.", colors.yellow) 
 
-class TakeFromBagHandler(AskUserEventHandler):
+class TakeFromBagHandler(PanelEventHandler):
     """This handler takes from a bag, placing items in inventory."""
 
     TITLE = "Items in this bag."
+    WIDTH = len(TITLE) + 4
 
-    def on_render(self, console: tcod.Console) -> None:
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
         """Render a bag's inventory."""
-        super().on_render(console)
-        number_of_items_in_bag = len(self.engine.enchanting_item.bag_inventory.items)
-
-        height = number_of_items_in_bag + 2
-
-        if height <= 3:
-            height = 3
-
         if self.engine.player.x <= 30:
             x = 40
         else:
@@ -1023,31 +1165,19 @@ class TakeFromBagHandler(AskUserEventHandler):
 
         y = 0
 
-        width = len(self.TITLE) + 4
+        width = self.WIDTH
 
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = width,
-            height = height,
-            title = self.TITLE,
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
+        lines = []
+        for item_key, item in zip(LOWER_LETTERS, self.engine.enchanting_item.bag_inventory.items):
+            num_in_pack = ""
+            item_gold_str = ""
+            if item.number_in_stack > 1:
+                num_in_pack = f" ({item.number_in_stack})"
+            if item.gold_value > 0:
+                item_gold_str = f" ${item.gold_value}"
+            lines.append(f"({item_key}) {item.name}{num_in_pack}{item_gold_str}")
 
-        if number_of_items_in_bag > 0:
-            for i, item in enumerate(self.engine.enchanting_item.bag_inventory.items):
-                item_key = chr(ord("a") + i)
-                num_in_pack = ""
-                item_gold_str = ""
-                if self.engine.enchanting_item.bag_inventory.items[i].number_in_stack > 1:
-                    num_in_pack = f" ({self.engine.enchant_item.bag_inventory.items[i].number_in_stack})"
-                if item.gold_value > 0:
-                    item_gold_str = f" ${item.gold_value}"
-                console.print(x + 1, y + i + 1, f"({item_key}) {item.name}" + num_in_pack + item_gold_str)
-        else:
-            console.print(x + 1, y + 1, "(Empty)")
+        return x, y, new_list_panel(width, self.TITLE, lines)
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -1057,12 +1187,11 @@ class TakeFromBagHandler(AskUserEventHandler):
         index = key - tcod.event.K_a
         bag = self.engine.enchanting_item
 
-        if 0 <= index <= 26:
-            try:
-                selected_item = self.engine.enchanting_item.bag_inventory.items[index]
-            except IndexError:
-                self.engine.message_log.add_message("Invalid entry.", colors.invalid)
-                return None
+        if len(self.engine.enchanting_item.bag_inventory.items) <= index < 26:
+            self.engine.message_log.add_message("Invalid entry.", colors.invalid)
+            return None
+        if 0 <= index < 26:
+            selected_item = self.engine.enchanting_item.bag_inventory.items[index]
             if len(player.inventory.items) >= player.inventory.capacity:
                 self.engine.message_log.add_message(f"You can't remove items from bags, inventory is full.")
             else:
@@ -1072,7 +1201,7 @@ class TakeFromBagHandler(AskUserEventHandler):
         else:
             return super().ev_keydown(event)
 
-class InventoryEventHandler(AskUserEventHandler):
+class InventoryEventHandler(PanelEventHandler):
     """This handler lets the user select an item.
 
     What happens then depends on the subclass.
@@ -1080,20 +1209,12 @@ class InventoryEventHandler(AskUserEventHandler):
 
 
 
-    def on_render(self, console: tcod.Console) -> None:
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
         """Render an inventory menu, which displays the items in the inventory,
         and the letter to select them.  Will move to a different position based
         on where the player is located, so the player can always see where
         they are.
         """
-        super().on_render(console)
-        number_of_items_in_inventory = len(self.engine.player.inventory.items)
-
-        height = number_of_items_in_inventory + 2
-
-        if height <= 3:
-            height = 3
-
         if self.engine.player.x <= 30:
             x = 40
         else:
@@ -1101,67 +1222,28 @@ class InventoryEventHandler(AskUserEventHandler):
 
         y = 0
 
-        width = len(self.TITLE) + 4
+        width = self.WIDTH
 
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = width,
-            height = height,
-            title = self.TITLE,
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
+        if not self.engine.player.inventory.items:
+            return x, y, empty_list_panel(width, self.TITLE)
 
-        if number_of_items_in_inventory > 0:
-            for i, item in enumerate(self.engine.player.inventory.items):
-                item_key = chr(ord("a") + i)
-                num_in_pack = ""
-                equip_status = ""
-                item_gold_str = ""
-                if self.engine.player.equipment.main_hand == item:
-                    if self.engine.player.equipment.main_hand.equippable.slot == EquipmentSlots.MAIN_HAND:
-                        equip_status = " (in main hand)"
-                    elif self.engine.player.equipment.main_hand.equippable.slot == EquipmentSlots.TWO_HAND:
-                        equip_status = " (in both hands)"
-                elif self.engine.player.equipment.off_hand == item:
-                    equip_status = " (on off hand)"
-                elif self.engine.player.equipment.ranged == item:
-                    equip_status = " (as ranged)"
-                elif self.engine.player.equipment.body == item:
-                    equip_status = " (worn on body)"
-                elif self.engine.player.equipment.neck == item:
-                    equip_status = " (worn on neck)"
-                elif self.engine.player.equipment.waist == item:
-                    equip_status = " (on waist)"
-                elif self.engine.player.equipment.lring == item:
-                    equip_status = " (on left hand)"
-                elif self.engine.player.equipment.rring == item:
-                    equip_status = " (on right hand)"
-                elif self.engine.player.equipment.head == item:
-                    equip_status = " (on head)"
-                elif self.engine.player.equipment.cloak == item:
-                    equip_status = " (worn on shoulders)"
-                elif self.engine.player.equipment.eyes == item:
-                    equip_status = " (worn on face)"
-                elif self.engine.player.equipment.shirt == item:
-                    equip_status = " (worn about torso)"
-                elif self.engine.player.equipment.wrists == item:
-                    equip_status = " (worn on wrists)"
-                elif self.engine.player.equipment.feet == item:
-                    equip_status = " (worn on feet)"
-                elif self.engine.player.equipment.hands == item:
-                    equip_status = " (worn on hands)"
-                elif self.engine.player.equipment.misc == item:
-                    equip_status =  " (worn slotless)"
-                if self.engine.player.inventory.items[i].number_in_stack > 1:
-                    num_in_pack = f" ({self.engine.player.inventory.items[i].number_in_stack})"
-                if item.gold_value > 0:
-                    item_gold_str = f" ${item.gold_value}"
-                console.print(x + 1, y + i + 1, f"({item_key}) {item.name}" + equip_status + num_in_pack + item_gold_str)
-        else:
-            console.print(x + 1, y + 1, "(Empty)")
+        lines = []
+        equipped_labels = equipped_item_labels(self.engine.player.equipment)
+        for item_key, item in zip(LOWER_LETTERS, self.engine.player.inventory.items):
+            num_in_pack = ""
+            equip_status = equipped_labels.get(id(item), "")
+            item_gold_str = ""
+            if item.number_in_stack > 1:
+                num_in_pack = f" ({item.number_in_stack})"
+            if item.gold_value > 0:
+                item_gold_str = f" ${item.gold_value}"
+            lines.append(f"({item_key}) {self.item_name(item)}{equip_status}{num_in_pack}{item_gold_str}")
+
+        return x, y, new_list_panel(width, self.TITLE, lines)
+
+    def item_name(self, item: Item) -> str:
+        """Return the name to list an item under."""
+        return item.name
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -1171,13 +1253,12 @@ class InventoryEventHandler(AskUserEventHandler):
         index = key - tcod.event.K_a
 
 
-        if self.engine.enchant_now == False:
-            if 0 <= index <= 26:
-                try:
-                    selected_item = player.inventory.items[index]
-                except IndexError:
-                    self.engine.message_log.add_message("Invalid entry.", colors.invalid)
-                    return None
+        if not self.engine.enchant_now:
+            if len(player.inventory.items) <= index < 26:
+                self.engine.message_log.add_message("Invalid entry.", colors.invalid)
+                return None
+            if 0 <= index < 26:
+                selected_item = player.inventory.items[index]
                 return self.on_item_selected(selected_item)
             return super().ev_keydown(event)
         else:
@@ -1187,6 +1268,7 @@ class PlaceInBagHandler(InventoryEventHandler):
     """Places one item from inventory in bag."""
     
     TITLE = "Choose an item to place in the bag."
+    WIDTH = len(TITLE) + 4
 
     def on_item_selected(self, item: Item) -> Optional[ActionOrHandler]:
         """Return the action for the selected item."""
@@ -1202,23 +1284,17 @@ class PlaceInBagHandler(InventoryEventHandler):
         
         index = key - tcod.event.K_a
 
-        if 0 <= index <= 26:
-            try:
-                selected_item = player.inventory.items[index]
-            except IndexError:
-                self.engine.message_log.add_message(f"Invalid entry.", colors.invalid)
-                return None
+        if len(player.inventory.items) <= index < 26:
+            self.engine.message_log.add_message(f"Invalid entry.", colors.invalid)
+            return None
+        if 0 <= index < 26:
+            selected_item = player.inventory.items[index]
             bag = self.engine.enchanting_item #Need to rename to some chosen item
             if len(bag.bag_inventory.items) >= bag.bag_inventory.capacity:
                 self.engine.message_log.add_message(f"Your bag is full.")
-            elif selected_item in (player.equipment.main_hand, player.equipment.off_hand, player.equipment.body,
-                        player.equipment.neck, player.equipment.ranged, player.equipment.waist,
-                        player.equipment.lring, player.equipment.rring, player.equipment.head,
-                        player.equipment.cloak, player.equipment.eyes, player.equipment.shirt,
-                        player.equipment.wrists, player.equipment.feet, player.equipment.hands,
-                        player.equipment.misc):
+            elif id(selected_item) in equipped_ids(player.equipment):
                 self.engine.message_log.add_message("You can't place something you are wearing in a bag.", colors.white)
-            elif selected_item.can_stack == True:
+            elif selected_item.can_stack:
                 self.engine.message_log.add_message("Stacking items not implemented for bags.", colors.white)
             elif selected_item == bag:
                 self.engine.message_log.add_message("You can't place a bag in itself.", colors.white)
@@ -1231,10 +1307,15 @@ class PlaceInBagHandler(InventoryEventHandler):
 class TextEntryEventHandler(AskUserEventHandler):
     def __init__(self, engine: Engine, input_text: str):
         self.engine = engine
-        self.input_text = input_text
+        self.input_chars = list(input_text)
     """For user to enter text, naming items or save files."""
 
+    @property
+    def input_text(self) -> str:
+        return "".join(self.input_chars)
+
     TITLE = "Enter text here."
+    WIDTH = len(TITLE) + 20
 
     def on_render(self, console: tcod.Console) -> None:
         """Renders text being entered.
@@ -1251,7 +1332,7 @@ class TextEntryEventHandler(AskUserEventHandler):
 
         y = 0
 
-        width = len(self.TITLE) + 20
+        width = self.WIDTH
 
         console.draw_frame(
             x = x,
@@ -1273,19 +1354,12 @@ class TextEntryEventHandler(AskUserEventHandler):
         key = event.sym
         modifier = event.mod
         
-        index = key - tcod.event.K_a
-
-
-        print(f"{chr(ord('a') + index)}")
-        print(f"in text input self.input_text")
         if key != tcod.event.K_ESCAPE and key != tcod.event.K_RETURN:
-            if modifier & (tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT): #Ugly hack, lshift or rshift
-                if key == tcod.event.K_EQUALS:
-                    self.input_text += "+"
-                if 0 <= index < 26:
-                    self.input_text += chr(ord("a") + index - 32)
-            else: #Need check for valid ascii, index range?
-                self.input_text += chr(ord("a") + index)
+            shift = bool(modifier & SHIFT_MASK)
+            char = TEXT_KEYS[shift].get(key)
+            if char:
+                self.input_chars.append(char)
+            if not shift:
                 return None
         else:
             self.engine.enchant_now = False
@@ -1298,6 +1372,7 @@ class SaveGameEventHandler(TextEntryEventHandler):
     """Save in game slot, name text input."""
 
     TITLE = "Enter save game name:"
+    WIDTH = len(TITLE) + 20
 
     
 
@@ -1305,12 +1380,28 @@ class RenameItemEventHandler(InventoryEventHandler):
     """Rename an Item, handy for enchanted gear"""
 
     TITLE = "Choose an item to rename."
+    WIDTH = len(TITLE) + 4
+
+    def __init__(self, engine: Engine):
+        super().__init__(engine)
+        # Characters typed so far.  The item's name is only set when renaming finishes.
+        self.name_buffer: List[str] = []
 
     def on_item_selected(self, item: Item) -> Optional[ActionOrHandler]:
         """Return the action for the selected item."""
         
         return None
 
+    def item_name(self, item: Item) -> str:
+        if self.engine.enchant_now and item is self.engine.enchanting_item:
+            return "".join(self.name_buffer)
+        return item.name
+
+    def on_exit(self) -> Optional[ActionOrHandler]:
+        if self.engine.enchant_now:
+            self.engine.enchanting_item.name = "".join(self.name_buffer)
+        return super().on_exit()
+
     def ev_keydown(
         self, event: tcod.event.KeyDown
         ) -> Optional[ActionOrHandler]:
@@ -1321,157 +1412,107 @@ class RenameItemEventHandler(InventoryEventHandler):
         index = key - tcod.event.K_a
         new_item_name = ""
 
-        if self.engine.enchant_now == True:
+        if self.engine.enchant_now:
             if key != tcod.event.K_ESCAPE and key != tcod.event.K_RETURN:
-                if modifier & (tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT): #Ugly hack, lshift or rshift
-                    if key == tcod.event.K_EQUALS:
-                            self.engine.enchanting_item.name += "+"
-                    if 0 <= index < 26:
-                        self.engine.enchanting_item.name = self.engine.enchanting_item.name + chr(ord("a") + index - 32)
-                else: #Need check for valid ascii, index range?
-                    if index < 1000:
-                        self.engine.enchanting_item.name = self.engine.enchanting_item.name + chr(ord("a") + index)
+                char = TEXT_KEYS[bool(modifier & SHIFT_MASK)].get(key)
+                if char:
+                    self.name_buffer.append(char)
             else:
+                self.engine.enchanting_item.name = "".join(self.name_buffer)
                 self.engine.message_log.add_message(f"Item renaming complete.")
                 self.engine.enchant_now = False
 
-        if self.engine.enchant_now == False:
-            if 0 <= index <= 26:
-                try:
-                    selected_item = player.inventory.items[index]
-                except IndexError:
-                    self.engine.message_log.add_message(f"Invalid entry.", colors.invalid)
-                    return None
+        if not self.engine.enchant_now:
+            if len(player.inventory.items) <= index < 26:
+                self.engine.message_log.add_message(f"Invalid entry.", colors.invalid)
+                return None
+            if 0 <= index < 26:
+                selected_item = player.inventory.items[index]
                 self.engine.message_log.add_message(f"Blanking item name.  Enter new name.", colors.white)
                 self.engine.enchanting_item = selected_item
                 selected_item.name = ""
+                self.name_buffer = []
                 self.engine.enchant_now = True
 
         return super().ev_keydown(event)
 
-class EnchantEventHandler(AskUserEventHandler):
+# Enchant option name -> (Equippable bonus attribute, extra levels counted when pricing the current bonus).
+ENCHANT_BONUS_ATTRS = types.MappingProxyType({
+    "Int": ("enhance_int_bonus", 0),
+    "Wis": ("enhance_wis_bonus", 0),
+    "Cha": ("enhance_cha_bonus", 0),
+    "Str": ("enhance_str_bonus", 0),
+    "Dex": ("enhance_dex_bonus", 0),
+    "Con": ("enhance_con_bonus", 0),
+    "Armor": ("enhance_armor_bonus", 0),
+    "Weapon": ("enhance_melee_bonus", 0),
+    "Ranged Weapon": ("enhance_ranged_bonus", 0),
+    "Shield": ("enhance_shield_bonus", 0),
+    "Animated Shield": ("enhance_shield_bonus", 2), # Animated costs + 2 bonus
+    "Ring of Protection": ("deflection_bonus", 0),
+    "Amulet of Natural Armor": ("enhance_na_bonus", 0),
+})
+
+# Enchant price formula name -> levels added to the bonus before squaring it.
+ENCHANT_FORMULA_OFFSETS = types.MappingProxyType({
+    "square": 0,
+    "square+2": 2,
+})
+
+def enchant_price(bonus: int, offset: int, cost_factor: int) -> int:
+    """Return the gold an enchantment of this bonus is worth: (bonus + offset) squared times the factor."""
+    return (bonus + offset)**2*cost_factor
+
+class EnchantEventHandler(PanelEventHandler):
     """This handler enchants items.
 
     Only at enchanting shops.
     """
 
     TITLE = "Enchanter's Shop"
-    def on_render(self, console: tcod.Console) -> None:
-        """Render an inventory menu, which displays the items in the inventory,
-        and the letter to select them.  Will move to a different position based
-        on where the player is located, so the player can always see where
-        they are.
-        """
-        super().on_render(console)
-        number_of_items_in_inventory = len(self.engine.player.inventory.items)
-
-        height = number_of_items_in_inventory + 2
-
-        if height <= 3:
-            height = 3
-
-        x = 0
-        y = 0
-
-        width = max(40, len(self.TITLE)) + 4
+    WIDTH = max(40, len(TITLE)) + 4
 
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = width,
-            height = height,
-            title = self.TITLE,
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
+    def __init__(self, engine: Engine):
+        super().__init__(engine)
+        # The options for the item being enchanted, see enchant_choices.
+        self.slot_choices: Optional[list] = None
+        self.option_lines: List[str] = []
 
-        if number_of_items_in_inventory > 0:
-            for i, item in enumerate(self.engine.player.inventory.items):
-                item_key = chr(ord("a") + i)
-                equip_status = ""
-                num_of_items = ""
-                if self.engine.player.equipment.main_hand == item:
-                    if self.engine.player.equipment.main_hand.equippable.slot == EquipmentSlots.MAIN_HAND:
-                        equip_status = " (in main hand)"
-                    elif self.engine.player.equipment.main_hand.equippable.slot == EquipmentSlots.TWO_HAND:
-                        equip_status = " (in both hands)"
-                elif self.engine.player.equipment.off_hand == item:
-                    equip_status = " (on off hand)"
-                elif self.engine.player.equipment.body == item:
-                    equip_status = " (worn on body)"
-                elif self.engine.player.equipment.neck == item:
-                    equip_status = " (worn on neck)"
-                elif self.engine.player.equipment.ranged == item:
-                    equip_status = " (as ranged)"
-                elif self.engine.player.equipment.waist == item:
-                    equip_status = " (on waist)"
-                elif self.engine.player.equipment.lring == item:
-                    equip_status = " (on left hand)"
-                elif self.engine.player.equipment.rring == item:
-                    equip_status = " (on right hand)"
-                elif self.engine.player.equipment.head == item:
-                    equip_status = " (on head)"
-                elif self.engine.player.equipment.cloak == item:
-                    equip_status = " (worn on shoulders)"
-                elif self.engine.player.equipment.eyes == item:
-                    equip_status = " (worn on face)"
-                elif self.engine.player.equipment.shirt == item:
-                    equip_status = " (worn about torso)"
-                elif self.engine.player.equipment.wrists == item:
-                    equip_status = " (worn on wrists)"
-                elif self.engine.player.equipment.feet == item:
-                    equip_status = " (worn on feet)"
-                elif self.engine.player.equipment.hands == item:
-                    equip_status = " (worn on hands)"
-                elif self.engine.player.equipment.misc == item:
-                    equip_status =  " (worn slotless)"
-                sell_price = int(item.gold_value / 2)
-                if item.number_in_stack > 1:
-                    num_of_items = f" ({item.number_in_stack})"
-                console.print(x + 1, y + i + 1, f"({item_key}) {item.name}" + num_of_items + equip_status + f" Sell price: {sell_price} gold.")
-        else:
-            console.print(x + 1, y + 1, "(Empty)")
-
-        if self.engine.enchant_now == True:
-            x = 5
-            y = 5
-            super().on_render(console)
-            console.draw_frame(
-                x,
-                y,
-                width = 60,
-                height = 20,
-                title = "Enchanting Options",
-                clear = True,
-                fg = (255, 255, 255),
-                bg = (0, 0, 0),
-            )
+    def enchant_choices(self) -> list:
+        """Return the enchanting options for the item being enchanted, built once per item.
+        The menu lines for them are built at the same time, into option_lines.
+        """
+        if self.slot_choices is None:
             enc_item = self.engine.enchanting_item
-            mint = enc_item.equippable.enhance_int_bonus
-            slot_choices = []
+            self.slot_choices = components.enchanter.enchanter_options(enc_item, enc_item.equippable.slot, [])
+            self.option_lines = [
+                f"({letter}) to improve {choice[0]} bonus to {choice[2]}: {int(choice[2])**2*choice[4]} gold."
+                for letter, choice in zip(LOWER_LETTERS, self.slot_choices[1:])
+            ]
+        return self.slot_choices
+
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
+        """Render an inventory menu, which displays the items in the inventory,
+        and the letter to select them.  Once an item is picked, show its
+        enchanting options instead.
+        """
+        if self.engine.enchant_now:
+            return self.draw_options_panel()
 
-            slot_choices = components.enchanter.enchanter_options(enc_item, enc_item.equippable.slot, slot_choices)
+        lines = item_sell_lines(self.engine.player)
+        return 0, 0, new_list_panel(self.WIDTH, self.TITLE, lines)
 
-            console.print(x + 1, y + 20, f"{enc_item.name}, slot: {enc_item.equippable.slot}, list size: {len(slot_choices)}")
+    def draw_options_panel(self) -> Tuple[int, int, tcod.Console]:
+        """Render the enchanting options for the item being enchanted."""
+        enc_item = self.engine.enchanting_item
+        self.enchant_choices()
 
-            y_hold = 1
-            console.print(x + 1, y + y_hold, f"{enc_item.name}, value: {enc_item.gold_value}")
+        lines = [f"{enc_item.name}, value: {enc_item.gold_value}"] + self.option_lines
 
-            for choices in range(len(slot_choices) - 1):
-                y_hold += 1
-                letter = chr(ord("a") + choices)
-                console.print(x + 1, y + y_hold,
-                    f"({letter}) to improve {slot_choices[choices + 1][0]} bonus to {slot_choices[choices + 1][2]}: {int(slot_choices[choices + 1][2])**2*slot_choices[choices + 1][4]} gold.")
-            """
-                item_key = chr(ord("a") + i)
-            console.print(x + 1, y + 1, f"{enc_item.name}, value: {enc_item.gold_value}")
-            console.print(x + 1, y + 2, f"Int Enhancement bonus of + {enc_item.equippable.enhance_int_bonus}")
-            console.print(x + 1, y + 3, f"(a) to Improve Int bonus to 2: 4000 - " + str(mint**2*1000) + " gold.")
-            console.print(x + 1, y + 4, f"(b) to Improve Int bonus to 4: 16000 - " + str(mint**2*1000) + " gold.")
-            console.print(x + 1, y + 5, f"(c) to Improve Int bonus to 6: 36000 - " + str(mint**2*1000) + " gold.")
-            console.print(x + 1, y + 6, f"Bonus value: " + str(mint**2*1000))
-            """
+        width = fit_width(60, lines)
+        panel = new_panel(width, 20, "Enchanting Options")
+        panel.print_box(1, 1, width - 2, 18, "\n".join(lines))
+        return 5, 5, panel
 
     def ev_keydown(
         self, event: tcod.event.KeyDown,
@@ -1483,111 +1524,57 @@ class EnchantEventHandler(AskUserEventHandler):
         discount = 0
 
         enc_item = self.engine.enchanting_item
-        slot_choices = []
 
-        if self.engine.enchant_now == True:
+        if self.engine.enchant_now:
             if key == tcod.event.K_ESCAPE:
                 self.engine.enchant_now = False
                 self.engine.message_log.add_message("Enchant Aborted.", colors.invalid)
                 return None
-            slot_choices = components.enchanter.enchanter_options(enc_item, enc_item.equippable.slot, slot_choices)
-            if slot_choices[index + 1][3] == "square":
-                cost = slot_choices[index +1 ][2]**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][3] == "square+2":
-                cost = (slot_choices[index + 1][2] + 2)**2*slot_choices[index + 1][4]
-            else:
+            slot_choices = self.enchant_choices()
+            choice = slot_choices[index + 1]
+            formula_offset = ENCHANT_FORMULA_OFFSETS.get(choice[3])
+            if formula_offset is None:
                 self.engine.message_log.add_message("Enchant formula not recognized.", colors.invalid)
                 self.engine.enchant_now = False
                 return None
-            if slot_choices[index + 1][0] == "Int":
-                discount = enc_item.equippable.enhance_int_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Wis":
-                discount = enc_item.equippable.enhance_wis_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Cha":
-                discount = enc_item.equippable.enhance_cha_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Str":
-                discount = enc_item.equippable.enhance_str_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Dex":
-                discount = enc_item.equippable.enhance_dex_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Con":
-                discount = enc_item.equippable.enhance_con_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Armor":
-                discount = enc_item.equippable.enhance_armor_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Weapon":
-                discount = enc_item.equippable.enhance_melee_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Ranged Weapon":
-                discount = enc_item.equippable.enhance_ranged_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Shield":
-                discount = enc_item.equippable.enhance_shield_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Animated Shield":
-                discount = (enc_item.equippable.enhance_shield_bonus + 2)**2*slot_choices[index + 1][4] #Animated costs + 2 bonus
-            elif slot_choices[index + 1][0] == "Ring of Protection":
-                discount = enc_item.equippable.deflection_bonus**2*slot_choices[index + 1][4]
-            elif slot_choices[index + 1][0] == "Amulet of Natural Armor":
-                discount = enc_item.equippable.enhance_na_bonus**2*slot_choices[index + 1][4]
-            else:
+            cost = enchant_price(choice[2], formula_offset, choice[4])
+            bonus_attr, bonus_offset = ENCHANT_BONUS_ATTRS.get(choice[0], (None, 0))
+            if bonus_attr is None:
                 self.engine.message_log.add_message("Discount option not found.", colors.invalid)
+            else:
+                discount = enchant_price(getattr(enc_item.equippable, bonus_attr), bonus_offset, choice[4])
             if player.battler.gold < (cost - discount):
                 self.engine.message_log.add_message("You don't have enough gold.", colors.invalid)
             elif discount >= cost:
                 self.engine.message_log.add_message("That wouldn't improve the item.", colors.invalid)
             else:
                 player.battler.gold -= (cost - discount)
-                self.engine.message_log.add_message(f"Your {slot_choices[0][1]} now gives + {slot_choices[index+1][2]} to {slot_choices[index+1][0]}.")
-                if slot_choices[index + 1][0] == "Int":
-                    enc_item.equippable.enhance_int_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Wis":
-                    enc_item.equippable.enhance_wis_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Cha":
-                    enc_item.equippable.enhance_cha_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Str":
-                    enc_item.equippable.enhance_str_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Dex":
-                    enc_item.equippable.enhance_dex_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Con":
-                    enc_item.equippable.enhance_con_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Armor":
-                    enc_item.equippable.enhance_armor_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Weapon":
-                    enc_item.equippable.enhance_melee_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Ranged Weapon":
-                    enc_item.equippable.enhance_ranged_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Shield":
-                    enc_item.equippable.enhance_shield_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Animated Shield":
-                    enc_item.equippable.enhance_shield_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Ring of Protection":
-                    enc_item.equippable.deflection_bonus = slot_choices[index + 1][2]
-                elif slot_choices[index + 1][0] == "Amulet of Natural Armor":
-                    enc_item.equippable.enhance_na_bonus = slot_choices[index + 1][2]
-                else:
+                self.engine.message_log.add_message(f"Your {slot_choices[0][1]} now gives + {choice[2]} to {choice[0]}.")
+                if bonus_attr is None:
                     self.engine.message_log.add_message("Enchant option not found.", colors.invalid)
+                else:
+                    setattr(enc_item.equippable, bonus_attr, choice[2])
             self.engine.enchant_now = False
             return None
 
-        if 0 <= index <= 26:
-            try:
-                selected_item = player.inventory.items[index]
-            except IndexError:
-                self.engine.message_log.add_message("Invalid entry.", colors.invalid)
-                return None
+        if len(player.inventory.items) <= index < 26:
+            self.engine.message_log.add_message("Invalid entry.", colors.invalid)
+            return None
+        if 0 <= index < 26:
+            selected_item = player.inventory.items[index]
             return self.enchant_item(selected_item)
         return super().ev_keydown(event)
 
     def enchant_item(self, item: Item) -> Optional[Action]:
         """Called when the user selects a valid item."""
         player = self.engine.player
-        if item in (player.equipment.main_hand, player.equipment.off_hand, player.equipment.body,
-                    player.equipment.neck, player.equipment.ranged, player.equipment.waist,
-                    player.equipment.lring, player.equipment.rring, player.equipment.head,
-                    player.equipment.cloak, player.equipment.eyes, player.equipment.shirt,
-                    player.equipment.wrists, player.equipment.feet, player.equipment.hands,
-                    player.equipment.misc):
+        if id(item) in equipped_ids(player.equipment):
             self.engine.message_log.add_message("You can't enchant something you are wearing.", colors.white)
-        elif item.can_stack == True:
+        elif item.can_stack:
             self.engine.message_log.add_message("The shop has no interest in that item.", colors.white)
-        elif item.equippable != None:
+        elif item.equippable is not None:
             self.engine.enchanting_item = item
+            self.slot_choices = None
             self.engine.message_log.add_message(f"Enchanting item is: {self.engine.enchanting_item.name}")
             self.engine.enchant_now = True
             return None
@@ -1595,87 +1582,21 @@ class EnchantEventHandler(AskUserEventHandler):
             raise Impossible(f"This item is not valid for enchanting.")
 
 
-class ShopSellEventHandler(AskUserEventHandler):
+class ShopSellEventHandler(PanelEventHandler):
     """This event sells to a shop."""
 
     TITLE = "Stuff to sell."
+    WIDTH = max(40, len(TITLE)) + 4
 
-    def on_render(self, console: tcod.Console) -> None:
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
         """Render an inventory menu, which displays the items in the inventory,
-        and the letter to select them.  Will move to a different position based
-        on where the player is located, so the player can always see where
-        they are.
+        and the letter to select them, with what the shop will pay for each.
         """
-        super().on_render(console)
-        number_of_items_in_inventory = len(self.engine.player.inventory.items)
-
-        height = number_of_items_in_inventory + 2
-
-        if height <= 3:
-            height = 3
-
-        x = 0
-        y = 0
-
-        width = max(40, len(self.TITLE)) + 4
-
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = width,
-            height = height,
-            title = self.TITLE,
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
-
-        if number_of_items_in_inventory > 0:
-            for i, item in enumerate(self.engine.player.inventory.items):
-                item_key = chr(ord("a") + i)
-                equip_status = ""
-                num_of_items = ""
-                if self.engine.player.equipment.main_hand == item:
-                    if self.engine.player.equipment.main_hand.equippable.slot == EquipmentSlots.MAIN_HAND:
-                        equip_status = " (in main hand)"
-                    elif self.engine.player.equipment.main_hand.equippable.slot == EquipmentSlots.TWO_HAND:
-                        equip_status = " (in both hands)"
-                elif self.engine.player.equipment.off_hand == item:
-                    equip_status = " (on off hand)"
-                elif self.engine.player.equipment.body == item:
-                    equip_status = " (worn on body)"
-                elif self.engine.player.equipment.neck == item:
-                    equip_status = " (worn on neck)"
-                elif self.engine.player.equipment.ranged == item:
-                    equip_status = " (as ranged)"
-                elif self.engine.player.equipment.waist == item:
-                    equip_status = " (on waist)"
-                elif self.engine.player.equipment.lring == item:
-                    equip_status = " (on left hand)"
-                elif self.engine.player.equipment.rring == item:
-                    equip_status = " (on right hand)"
-                elif self.engine.player.equipment.head == item:
-                    equip_status = " (on head)"
-                elif self.engine.player.equipment.cloak == item:
-                    equip_status = " (worn on shoulders)"
-                elif self.engine.player.equipment.eyes == item:
-                    equip_status = " (worn on face)"
-                elif self.engine.player.equipment.shirt == item:
-                    equip_status = " (worn about torso)"
-                elif self.engine.player.equipment.wrists == item:
-                    equip_status = " (worn on wrists)"
-                elif self.engine.player.equipment.feet == item:
-                    equip_status = " (worn on feet)"
-                elif self.engine.player.equipment.hands == item:
-                    equip_status = " (worn on hands)"
-                elif self.engine.player.equipment.misc == item:
-                    equip_status =  " (worn slotless)"
-                sell_price = int(item.gold_value / 2)
-                if item.number_in_stack > 1:
-                    num_of_items = f" ({item.number_in_stack})"
-                console.print(x + 1, y + i + 1, f"({item_key}) {item.name}" + num_of_items + equip_status + f" Sell price: {sell_price} gold.")
-        else:
-            console.print(x + 1, y + 1, "(Empty)")
+        width = self.WIDTH
+        if not self.engine.player.inventory.items:
+            return 0, 0, empty_list_panel(width, self.TITLE)
+        lines = item_sell_lines(self.engine.player)
+        return 0, 0, new_list_panel(width, self.TITLE, lines)
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -1684,28 +1605,23 @@ class ShopSellEventHandler(AskUserEventHandler):
         key = event.sym
         index = key - tcod.event.K_a
 
-        if 0 <= index <= 26:
-            try:
-                selected_item = player.inventory.items[index]
-            except IndexError:
-                self.engine.message_log.add_message("Invalid entry.", colors.invalid)
-                return None
+        if len(player.inventory.items) <= index < 26:
+            self.engine.message_log.add_message("Invalid entry.", colors.invalid)
+            return None
+        if 0 <= index < 26:
+            selected_item = player.inventory.items[index]
             return self.sell_item(selected_item)
         return super().ev_keydown(event)
 
     def sell_item(self, item: Item) -> Optional[Action]:
         """Called when the user selects a valid item."""
         player = self.engine.player
-        if item in (player.equipment.main_hand, player.equipment.off_hand, player.equipment.body,
-                    player.equipment.neck, player.equipment.ranged, player.equipment.waist,
-                    player.equipment.lring, player.equipment.rring, player.equipment.head,
-                    player.equipment.cloak, player.equipment.eyes, player.equipment.shirt,
-                    player.equipment.wrists, player.equipment.feet, player.equipment.hands,
-                    player.equipment.misc):
+        if id(item) in equipped_ids(player.equipment):
             self.engine.message_log.add_message("You can't sell something you are wearing.", colors.white)
         elif item.gold_value > 0:
-            player.battler.gold += int(item.gold_value / 2)
-            self.engine.message_log.add_message(f"You sell the {item.name} for {int(item.gold_value / 2)} gold.", colors.yellow)
+            sell_price = item.sell_price
+            player.battler.gold += sell_price
+            self.engine.message_log.add_message(f"You sell the {item.name} for {sell_price} gold.", colors.yellow)
             if item.number_in_stack > 1:
                 item.number_in_stack -= 1
             else:
@@ -1717,6 +1633,7 @@ class InventoryActivateHandler(InventoryEventHandler):
     """Handle using an inventory item."""
 
     TITLE = "Select an item to use, letter corresponds to item."
+    WIDTH = len(TITLE) + 4
 
     def on_item_selected(self, item: Item) -> Optional[ActionOrHandler]:
         """Return the action for the selected item."""
@@ -1732,72 +1649,34 @@ class InventoryDropHandler(InventoryEventHandler):
     """Handle dropping an inventory item."""
 
     TITLE = "Select an item to drop, letter corresponds to item."
+    WIDTH = len(TITLE) + 4
 
     def on_item_selected(self, item: Item) -> Optional[ActionOrHandler]:
         """Drop this item."""
         return actions.DropItem(self.engine.player, item)
 
-class EquipmentHandler(AskUserEventHandler):
+class EquipmentHandler(PanelEventHandler):
     """Handle removing or viewing equipped items."""
 
     TITLE = "Select an item remove, letter corresponds to item."
+    WIDTH = max(40, len(TITLE)) + 4
             
-    def on_render(self, console: tcod.Console) -> None:
+    def draw_panel(self) -> Tuple[int, int, tcod.Console]:
         """Render equipment screen.  This displays worn gear,
         and allows the user to remove items.
         """
-        super().on_render(console)
+        panel = new_panel(self.WIDTH, 30, self.TITLE)
 
-        height = 30
-
-        x = 0
-        y = 0
-
-        width = max(40, len(self.TITLE)) + 4
-
-        console.draw_frame(
-            x = x,
-            y = y,
-            width = width,
-            height = height,
-            title = self.TITLE,
-            clear = True,
-            fg = (255, 255, 255),
-            bg = (0, 0, 0),
-        )
-
-        equipment_set = ["in main hand", "on off hand", "worn on body", "worn on neck", "as ranged", "on waist", "on left hand", "on right hand",
-                     "on head", "worn on shoulders", "worn on eyes", "worn about torso", "worn on wrists", "worn on feet", "worn on hands",
-                     "as Animated Shield"]
-
-        """
-        gear_list = [f"{self.engine.player.equipment.main_hand.name}", f"{self.engine.player.equipment.off_hand.name}",
-                     f"{self.engine.player.equipment.body.name}", f"{self.engine.player.equipment.neck.name}",
-                     f"{self.engine.player.equipment.ranged.name}", f"{self.engine.player.equipment.waist.name}",
-                     f"{self.engine.player.equipment.lring.name}", f"{self.engine.player.equipment.rring.name}",
-                     f"{self.engine.player.equipment.head.name}", f"{self.engine.player.equipment.cloak.name}",
-                     f"{self.engine.player.equipment.eyes.name}", f"{self.engine.player.equipment.shirt.name}",
-                     f"{self.engine.player.equipment.wrists.name}", f"{self.engine.player.equipment.feet.name}",
-                     f"{self.engine.player.equipment.hands.name}", f"{self.engine.player.equipment.misc.name}"]
-        """
-        check_list = [self.engine.player.equipment.main_hand, self.engine.player.equipment.off_hand,
-                     self.engine.player.equipment.body, self.engine.player.equipment.neck,
-                     self.engine.player.equipment.ranged, self.engine.player.equipment.waist,
-                     self.engine.player.equipment.lring, self.engine.player.equipment.rring,
-                     self.engine.player.equipment.head, self.engine.player.equipment.cloak,
-                     self.engine.player.equipment.eyes, self.engine.player.equipment.shirt,
-                     self.engine.player.equipment.wrists, self.engine.player.equipment.feet,
-                     self.engine.player.equipment.hands, self.engine.player.equipment.misc]
-
-        for gear in range(len(equipment_set)):
-            line = f"[None]"
-            if check_list[gear] == None:
-                line = f"[None] ({equipment_set[gear]})"
+        equipment = self.engine.player.equipment
+        for gear, (slot_name, label) in enumerate(EQUIPMENT_SCREEN_SLOTS):
+            item = getattr(equipment, slot_name)
+            if item is None:
+                line = f"[None] ({label})"
             else:
-                letter = chr(ord("a") + gear)
-                line = f"({letter})    {check_list[gear].name} ({equipment_set[gear]})"
-            console.print(x + 1, y + gear + 1, line)
-                
+                letter = LOWER_LETTERS[gear]
+                line = f"({letter})    {item.name} ({label})"
+            panel.print(1, gear + 1, line)
+        return 0, 0, panel
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
@@ -1806,28 +1685,29 @@ class EquipmentHandler(AskUserEventHandler):
         key = event.sym
         index = key - tcod.event.K_a
 
-        check_list = [self.engine.player.equipment.main_hand, self.engine.player.equipment.off_hand,
-                     self.engine.player.equipment.body, self.engine.player.equipment.neck,
-                     self.engine.player.equipment.ranged, self.engine.player.equipment.waist,
-                     self.engine.player.equipment.lring, self.engine.player.equipment.rring,
-                     self.engine.player.equipment.head, self.engine.player.equipment.cloak,
-                     self.engine.player.equipment.eyes, self.engine.player.equipment.shirt,
-                     self.engine.player.equipment.wrists, self.engine.player.equipment.feet,
-                     self.engine.player.equipment.hands, self.engine.player.equipment.misc]
-
-        if len(check_list) > index >= 0 and check_list[index] != None:
-            check_list[index].equippable.activate(self.engine.player)
+        if 0 <= index < len(EQUIPMENT_SCREEN_SLOTS):
+            item = getattr(player.equipment, EQUIPMENT_SCREEN_SLOTS[index][0])
+            if item is not None:
+                item.equippable.activate(player)
         if key == tcod.event.K_ESCAPE:
             return super().ev_keydown(event)
 
+def highlight_tile(console: tcod.Console, x: int, y: int) -> None:
+    """Draw the targeting cursor, black on white, at x, y."""
+    console.tiles_rgb["bg"][x, y] = colors.white
+    console.tiles_rgb["fg"][x, y] = colors.black
+
 class SelectIndexHandler(AskUserEventHandler):
     """Handles asking the user for an index on the map."""
 
-    def __init__(self, engine: Engine):
-        """Sets the cursor to the player when this handler is constructed."""
+    def __init__(self, engine: Engine, callback: Optional[Callable[[Tuple[int, int]], Optional[ActionOrHandler]]] = None):
+        """Sets the cursor to the player when this handler is constructed.
+        callback, if given, is called with the (x, y) picked.
+        """
         super().__init__(engine)
+        self.callback = callback
         player = self.engine.player
-        if self.engine.last_target.is_alive == True and self.engine.game_map.visible[self.engine.last_target.x][self.engine.last_target.y] == True:
+        if self.engine.last_target.is_alive and self.engine.game_map.visible[self.engine.last_target.x, self.engine.last_target.y]:
             engine.mouse_location = self.engine.last_target.x, self.engine.last_target.y
         else:
             engine.mouse_location = player.x, player.y
@@ -1836,26 +1716,25 @@ class SelectIndexHandler(AskUserEventHandler):
     def on_render(self, console: tcod.Console) -> None:
         """Highlight the tile under the cursor."""
         super().on_render(console)
-        x, y, = self.engine.mouse_location
-        console.tiles_rgb["bg"][x, y] = colors.white
-        console.tiles_rgb["fg"][x, y] = colors.black
+        highlight_tile(console, *self.engine.mouse_location)
 
     def ev_keydown(
         self, event: tcod.event.KeyDown
         ) -> Optional[ActionOrHandler]:
         """Check for key movement or confirmation keys."""
         key = event.sym
-        if key in MOVE_KEYS:
+        move = MOVE_KEYS.get(key)
+        if move:
             modifier = 1 # Holding modifier keys will speed up key movement.
-            if event.mod & (tcod.event.KMOD_LSHIFT | tcod.event.KMOD_RSHIFT):
+            if event.mod & SHIFT_MASK:
                 modifier *= 5
-            if event.mod & (tcod.event.KMOD_LCTRL | tcod.event.KMOD_RCTRL):
+            if event.mod & CTRL_MASK:
                 modifier *= 10
-            if event.mod & (tcod.event.KMOD_LALT | tcod.event.KMOD_RALT):
+            if event.mod & ALT_MASK:
                 modifier *= 20
 
             x, y = self.engine.mouse_location
-            dx, dy = MOVE_KEYS[key]
+            dx, dy = move
             x += dx * modifier
             y += dy * modifier
             # Clamp the cursor index to the map size.
@@ -1878,99 +1757,94 @@ class SelectIndexHandler(AskUserEventHandler):
 
     def on_index_selected(self, x: int, y: int) -> Optional[ActionOrHandler]:
         """Called when an index is selected."""
-        raise NotImplementedError()
+        if self.callback is None:
+            raise NotImplementedError()
+        return self.callback((x, y))
+
+def closest_in_cones(
+    xs: np.ndarray, ys: np.ndarray, visible: np.ndarray, px: int, py: int
+    ) -> Dict[str, np.ndarray]:
+    """Return, for each arrow direction, the indices of the visible positions in that cone
+    from (px, py), closest first.  A position on a diagonal is in both neighbouring cones.
+    """
+    dx = xs - px
+    dy = ys - py
+    adx = np.abs(dx)
+    ady = np.abs(dy)
+    seen = visible[xs, ys]
+    masks = {
+        "Up": seen & (dy < 0) & (ady >= adx),
+        "Down": seen & (dy > 0) & (ady >= adx),
+        "Left": seen & (dx < 0) & (adx >= ady),
+        "Right": seen & (dx > 0) & (adx >= ady),
+    }
+    # Squared distance sorts the same as distance, without the sqrt.
+    dist_squared = dx * dx + dy * dy
+    cones = {}
+    for direction, mask in masks.items():
+        indices = np.flatnonzero(mask)
+        cones[direction] = indices[np.argsort(dist_squared[indices], kind = "stable")]
+    return cones
 
 class SelectMonsterHandler(AskUserEventHandler):
     """Rapidly target monsters.  Cone by arrow/number, closest first.."""
 
-    def __init__(self, engine: Engine):
-        """Sets the cursor to the player when this handler is constructed."""
+    def __init__(self, engine: Engine, callback: Optional[Callable[[Tuple[int, int]], Optional[ActionOrHandler]]] = None):
+        """Sets the cursor to the player when this handler is constructed.
+        callback, if given, is called with the (x, y) picked.
+        """
         super().__init__(engine)
+        self.callback = callback
         player = self.engine.player
-        if self.engine.last_target.is_alive == True and self.engine.game_map.visible[self.engine.last_target.x][self.engine.last_target.y] == True:
+        if self.engine.last_target.is_alive and self.engine.game_map.visible[self.engine.last_target.x, self.engine.last_target.y]:
             engine.mouse_location = self.engine.last_target.x, self.engine.last_target.y # If alive and visible, target last opponent.
         else: # Without this check you can target around corners.  If not visible, reset to player so you can't.
             engine.mouse_location = player.x, player.y
+        self.cones: Optional[Dict[str, List[Actor]]] = None
 
     def on_render(self, console: tcod.Console) -> None:
         """Highlight the tile under the cursor."""
         super().on_render(console)
-        x, y, = self.engine.mouse_location
-        console.tiles_rgb["bg"][x, y] = colors.white
-        console.tiles_rgb["fg"][x, y] = colors.black
-        
+        highlight_tile(console, *self.engine.mouse_location)
+
+    def target_cones(self) -> Dict[str, List[Actor]]:
+        """Return the visible actors in each direction's cone, closest first.
+
+        No turns pass while targeting, so the cones are worked out once, on arrays of actor positions.
+        """
+        if self.cones is None:
+            player = self.engine.player
+            actors = list(self.engine.game_map.actors)
+            xs = np.fromiter((actor.x for actor in actors), dtype = np.intp, count = len(actors))
+            ys = np.fromiter((actor.y for actor in actors), dtype = np.intp, count = len(actors))
+            cone_indices = closest_in_cones(xs, ys, self.engine.game_map.visible, player.x, player.y)
+            self.cones = {
+                direction: [actors[i] for i in indices] for direction, indices in cone_indices.items()
+            }
+        return self.cones
+
     def ev_keydown(
         self, event: tcod.event.KeyDown
         ) -> Optional[ActionOrHandler]:
         """Check for key movement or confirmation keys."""
         key = event.sym
-        NSEW_KEYS = (tcod.event.K_UP, tcod.event.K_KP_8, tcod.event.K_DOWN, tcod.event.K_KP_2,
-                     tcod.event.K_LEFT, tcod.event.K_KP_4, tcod.event.K_RIGHT, tcod.event.K_KP_6)
-
-        quick_list = []
-        dist_list = []
         player = self.engine.player
         lastkey = self.engine.last_keypress
-        num_times_pressed = self.engine.num_pressed
-        
-        if key in NSEW_KEYS:
-            if lastkey == "None":
-                x, y = player.x, player.y
+
+        direction = TARGET_DIRECTION_KEYS.get(key)
+        if direction is not None:
             """Checks for monsters in cone for cardinal directions: N, S, E, W."""
-            if key in (tcod.event.K_UP, tcod.event.K_KP_8):
-                if lastkey == "Up":
-                    self.engine.num_pressed += 1
-                else:
-                    self.engine.num_pressed = 0
-                self.engine.last_keypress = "Up"
-                for monster in self.engine.game_map.actors:
-                    if monster.y < self.engine.player.y:
-                        if self.engine.game_map.visible[monster.x, monster.y]:
-                            if abs(monster.y - player.y) >= abs(monster.x - player.x):
-                                quick_list.append(monster)
-            elif key in (tcod.event.K_DOWN, tcod.event.K_KP_2):
-                if lastkey == "Down":
-                    self.engine.num_pressed += 1
-                else:
-                    self.engine.num_pressed = 0
-                self.engine.last_keypress = "Down"
-                for monster in self.engine.game_map.actors:
-                    if monster.y > self.engine.player.y:
-                        if self.engine.game_map.visible[monster.x, monster.y]:
-                            if abs(monster.y - player.y) >= abs(monster.x - player.x):
-                                quick_list.append(monster)
-            elif key in (tcod.event.K_LEFT, tcod.event.K_KP_4):
-                if lastkey == "Left":
-                    self.engine.num_pressed += 1
-                else:
-                    self.engine.num_pressed = 0
-                self.engine.last_keypress = "Left"
-                for monster in self.engine.game_map.actors:
-                    if monster.x < self.engine.player.x:
-                        if self.engine.game_map.visible[monster.x, monster.y]:
-                            if abs(monster.y - player.y) <= abs(monster.x - player.x):
-                                quick_list.append(monster)             
-            elif key in (tcod.event.K_RIGHT, tcod.event.K_KP_6):
-                if lastkey == "Right":
-                    self.engine.num_pressed += 1
-                else:
-                    self.engine.num_pressed = 0
-                self.engine.last_keypress = "Right"
-                for monster in self.engine.game_map.actors:
-                    if monster.x > self.engine.player.x:
-                        if self.engine.game_map.visible[monster.x, monster.y]:
-                            if abs(monster.y - player.y) <= abs(monster.x - player.x):
-                                quick_list.append(monster)
-            """Sort by distance, closest first."""
-            for monster in quick_list:
-                dist = math.sqrt((player.x - monster.x)**2 + (player.y - monster.y)**2)
-                dist_list.append([dist, monster])
-            dist_list = sorted(dist_list, key=lambda x: x[0])
+            if lastkey == direction:
+                self.engine.num_pressed += 1
+            else:
+                self.engine.num_pressed = 0
+            self.engine.last_keypress = direction
+            dist_list = self.target_cones()[direction]
             if dist_list:
                 if self.engine.num_pressed > len(dist_list) - 1:
                     self.engine.num_pressed = 0
-                    self.engine.last_keypress = "None"                
-                target = dist_list[self.engine.num_pressed][1]
+                    self.engine.last_keypress = None
+                target = dist_list[self.engine.num_pressed]
                 x, y = target.x, target.y
             else:
                 x, y = player.x, player.y
@@ -1995,23 +1869,14 @@ class SelectMonsterHandler(AskUserEventHandler):
 
     def on_index_selected(self, x: int, y: int) -> Optional[ActionOrHandler]:
         """Called when an index is selected."""
-        raise NotImplementedError()
+        if self.callback is None:
+            raise NotImplementedError()
+        return self.callback((x, y))
 
 
 class ThrowShootEventHandler(SelectMonsterHandler):
     """Throws or Shoots at target selected by keyboard or mouse."""
 
-    def __init__(
-        self, engine: Engine, callback: Callable[[Tuple[int, int]],
-                                                 Optional[ActionOrHandler]]
-    ):
-        super().__init__(engine)
-
-        self.callback = callback
-
-    def on_index_selected(self, x: int, y: int) -> RangedAction:
-        return self.callback((x, y))
-
 class LookHandler(SelectIndexHandler):
     "Lets the player look around using the keyboard."""
 
@@ -2022,33 +1887,9 @@ class LookHandler(SelectIndexHandler):
 class SingleMeleeAttackHandler(SelectIndexHandler):
     "Handles targeting a single melee enemy."
 
-    def __init__(
-        self,
-        engine: Engine,
-        callback: Callable[[Tuple[int, int]], Optional[ActionOrHandler]]
-    ):
-        super().__init__(engine)
-
-        self.callback = callback
-
-    def on_index_selected(self, x: int, y: int) -> Optional[ActionOrHandler]:
-        return self.callback((x, y))
-
 class SingleRangedAttackHandler(SelectMonsterHandler):
     "Handles targeting a single enemy.  Only the enemy selected will be affected."""
 
-    def __init__(
-        self,
-        engine: Engine,
-        callback: Callable[[Tuple[int, int]], Optional[ActionOrHandler]]
-    ):
-        super().__init__(engine)
-
-        self.callback = callback
-
-    def on_index_selected(self, x: int, y: int) -> Optional[ActionOrHandler]:
-        return self.callback((x, y))
-
 class AreaRangedAttackHandler(SelectIndexHandler):
     """
     Handles targeting an area with a given radious.
@@ -2061,10 +1902,9 @@ class AreaRangedAttackHandler(SelectIndexHandler):
         radius: int,
         callback: Callable[[Tuple[int, int]], Optional[ActionOrHandler]],
     ):
-        super().__init__(engine)
+        super().__init__(engine, callback)
 
         self.radius = radius
-        self.callback = callback
 
     def on_render(self, console: tcod.Console) -> None:
         """Highlight the tile under the cursor."""
@@ -2073,19 +1913,17 @@ class AreaRangedAttackHandler(SelectIndexHandler):
         x, y = self.engine.mouse_location
 
         # Draw a rectangle around the targeted area, so the player
-        # can see the affected tiles
+        # can see the affected tiles.  The border sits one tile outside the
+        # radius on every side.
         console.draw_frame(
             x = x - self.radius - 1,
             y = y - self.radius - 1,
-            width = self.radius ** 2,
-            height = self.radius ** 2,
+            width = self.radius * 2 + 3,
+            height = self.radius * 2 + 3,
             fg = colors.red,
             clear = False,
         )
 
-    def on_index_selected(self, x: int, y: int) -> Optional[ActionOrHandler]:
-        return self.callback((x, y))
-
 class SummonMonsterHandler(SelectIndexHandler):
     """
     Handles targeting a square to summon a monster.
@@ -2097,10 +1935,9 @@ class SummonMonsterHandler(SelectIndexHandler):
         callback: Callable[[Tuple[int, int]], Optional[ActionOrHandler]],
         radius: int = 0,
     ):
-        super().__init__(engine)
+        super().__init__(engine, callback)
 
         self.radius = radius
-        self.callback = callback
 
     def on_render(self, console: tcod.Console) -> None:
         """Highlight the tile under the cursor."""
@@ -2118,9 +1955,6 @@ class SummonMonsterHandler(SelectIndexHandler):
             fg = colors.red,
             clear = False,
         )
-
-    def on_index_selected(self, x: int, y: int) -> Optional[ActionOrHandler]:
-        return self.callback((x, y))
     
 class TakeStairsHandler(EventHandler):
     #Takes stairs, up or down, generating new level.
@@ -2131,7 +1965,6 @@ class TakeStairsHandler(EventHandler):
         engine: Engine,
     ):
         constants = get_constants()
-        print("did it get here?")
         for entity in self.engine.game_map.entities:
             if (entity.stairs and entity.x == self.engine.player.x and entity.y == self.engine.player.y):
                 self.engine.game_map = generate_dungeon(
@@ -2144,6 +1977,5 @@ class TakeStairsHandler(EventHandler):
                     engine = self.engine,
                 )
             return MainGameEventHandler(self.engine)
-        print('no stairs here.')
         return MainGameEventHandler(self.engine)
 
@@ -1,29 +1,30 @@
 import os
 
-import shelve
+import gzip
 import pickle
-import copy
+
+GZIP_MAGIC = b"\x1f\x8b"
 
 def save_game(engine, player, game_map, save_name: str = 'savegame'):
-    with shelve.open(save_name, 'n') as data_file:
-        data_file['engine'] = engine
-        data_file['player'] = player
-        data_file['game_map'] = game_map
-        data_file.close()
+    """Save the engine as one compressed pickle.  The player and map are reached through it."""
+    with gzip.open(save_name + '.dat', 'wb', compresslevel = 1) as data_file:
+        pickle.dump(engine, data_file, protocol = pickle.HIGHEST_PROTOCOL)
 
 def load_game():
     if not os.path.isfile('savegame.dat'):
         raise FileNotFoundError
 
-    with shelve.open('savegame', 'r') as data_file:
-        engine = data_file['engine']
-        player = data_file['player']
-        game_map = data_file['game_map']
-        #engine.player = player
-        #engine.player.parent = engine
-        data_file.close()
+    with open('savegame.dat', 'rb') as data_file:
+        is_gzip = data_file.read(2) == GZIP_MAGIC
+
+    # Shelve saves from before the switch hold an engine, map and entities
+    # that predate the current caches and can't be played.  Treat them the
+    # same as having no save.
+    if not is_gzip:
+        raise FileNotFoundError("The saved game is from an older version and can't be loaded.")
 
-    return engine#, player, game_map
+    with gzip.open('savegame.dat', 'rb') as data_file:
+        return pickle.load(data_file)
 """
 def save_game(player, entities, game_map, message_log):
     with shelve.open('savegame', 'n') as data_file:
@@ -1,6 +1,11 @@
+import functools
+import types
+
 import tcod
 
+@functools.lru_cache(maxsize = 1)
 def get_constants():
+    """Return the game constants.  Loaded once, the tilesets are slow to build."""
     window_title = 'Generic d20 Roguelike'
 
     tileset = tcod.tileset.load_tilesheet(
@@ -46,7 +51,8 @@ def get_constants():
     max_monsters_per_room = 2
     max_items_per_room = 2
     
-    constants = {
+    # Every caller shares this one cached mapping, so it is read-only.
+    constants = types.MappingProxyType({
         'window_title': window_title,
         'tileset': tileset,
         'screen_width': screen_width,
@@ -62,6 +68,6 @@ def get_constants():
         'room_max_size': room_max_size,
         'room_min_size': room_min_size,
         'max_rooms': max_rooms,
-    }
+    })
 
     return constants
@@ -32,21 +32,37 @@ def main() -> None:
             vsync = True,
         ) as context:
             root_console = tcod.Console(constants['screen_width'], constants['screen_height'], order = "F")
+            redraw = True
+            mouse_tile = None
             while True:
-                root_console.clear()
-                handler.on_render(console = root_console)
-                context.present(root_console)
-                try:
-                    for event in tcod.event.wait():
-                        context.convert_event(event)   
+                if redraw:
+                    root_console.clear()
+                    handler.on_render(console = root_console)
+                    context.present(root_console)
+                redraw = False
+                for event in tcod.event.wait():
+                    context.convert_event(event)   
+                    # Only the handler runs game code, so only it needs guarding.  An
+                    # error drops just the one event, the rest of the batch still runs.
+                    try:
                         handler = handler.handle_events(event)
-                except Exception: # Handle exceptions in game
-                    traceback.print_exc() # Print error to stderr.
-                    # The print the error to the message log.
-                    if isinstance(handler, input_handlers.EventHandler):
-                        handler.engine.message_log.add_message(
-                            traceback.format_exc(), colors.error
-                        )
+                    except Exception: # Handle exceptions in game
+                        redraw = True
+                        traceback.print_exc() # Print error to stderr.
+                        # The print the error to the message log.
+                        if isinstance(handler, input_handlers.EventHandler):
+                            handler.engine.message_log.add_message(
+                                traceback.format_exc(), colors.error
+                            )
+                        continue
+                    # Letting go of a key, or moving the mouse within one tile, changes
+                    # nothing on screen, so those don't need a new frame.
+                    if isinstance(event, tcod.event.MouseMotion):
+                        if event.tile != mouse_tile:
+                            mouse_tile = event.tile
+                            redraw = True
+                    elif not isinstance(event, tcod.event.KeyUp):
+                        redraw = True
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,4 @@
-from typing import Iterable, List, Reversible, Tuple
+from typing import Iterable, List, Optional, Reversible, Tuple
 import textwrap
 
 import tcod
@@ -61,14 +61,22 @@ class MessageLog:
         width: int,
         height: int,
         messages: Reversible[Message],
+        end: Optional[int] = None,
     ) -> None:
         """Render the messages provided.
         The `messages` are rendered starting at  the last message and working
         backwards.
+        If `end` is given, `messages` must be a sequence and rendering starts
+        at `messages[end - 1]` instead, without copying the list.
         """
         y_offset = height - 1
 
-        for message in reversed(messages):
+        if end is None:
+            shown_messages: Iterable[Message] = reversed(messages)
+        else:
+            shown_messages = (messages[i] for i in range(end - 1, -1, -1))
+
+        for message in shown_messages:
             for line in reversed(list(cls.wrap(message.full_text, width))):
                 console.print(x = x, y = y + y_offset, string = line, fg = message.fg)
                 y_offset -= 1
@@ -1,6 +1,6 @@
-from enum import auto, Enum
+from enum import auto, IntEnum
 
-class RenderOrder(Enum):
+class RenderOrder(IntEnum):
     STAIRS = auto()
     CORPSE = auto()
     ITEM = auto()